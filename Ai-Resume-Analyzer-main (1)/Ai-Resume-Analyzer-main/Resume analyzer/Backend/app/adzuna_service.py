@@ -1,11 +1,65 @@
 import os
 import httpx
 import json
-from .ats import client as groq_client
+import asyncio
+from .ats import GROQ_MODEL
+from .llm_gateway import llm_gateway
+from .prompt_compaction import compact_resume, KEYWORDS_TOKEN_BUDGET
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from .skill_engine import taxonomy_matcher_with
+from .response_cache import StaleWhileRevalidateCache
+from .job_store import job_store, near_duplicate_key, clean_title
+from starlette.concurrency import run_in_threadpool
+from .metrics import stage, timed, adzuna_mock_fallbacks
 
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
 ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
-ADZUNA_BASE_URL = "http://api.adzuna.com/v1/api/jobs"
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "http://api.adzuna.com/v1/api/jobs")
+
+ADZUNA_PAGES = int(os.getenv("ADZUNA_PAGES", "2"))
+ADZUNA_RESULTS_PER_PAGE = int(os.getenv("ADZUNA_RESULTS_PER_PAGE", "20"))
+ADZUNA_QUERY_SKILLS = int(os.getenv("ADZUNA_QUERY_SKILLS", "2"))
+ADZUNA_MAX_CONCURRENCY = int(os.getenv("ADZUNA_MAX_CONCURRENCY", "6"))
+ADZUNA_TIMEOUT = float(os.getenv("ADZUNA_TIMEOUT", "5"))
+# Overall budget for one fan-out; searches still running after it are dropped.
+ADZUNA_DEADLINE = float(os.getenv("ADZUNA_DEADLINE", "8"))
+ADZUNA_MAX_RESULTS = int(os.getenv("ADZUNA_MAX_RESULTS", "30"))
+ADZUNA_CACHE_TTL = float(os.getenv("ADZUNA_CACHE_TTL", "900"))
+ADZUNA_CACHE_STALE_TTL = float(os.getenv("ADZUNA_CACHE_STALE_TTL", "3600"))
+ADZUNA_CACHE_MAX_ENTRIES = int(os.getenv("ADZUNA_CACHE_MAX_ENTRIES", "2000"))
+# Serve from the local job store when at least this many postings match the role by title.
+JOB_STORE_MIN_RESULTS = int(os.getenv("JOB_STORE_MIN_RESULTS", "10"))
+JOB_STORE_SEARCH_LIMIT = int(os.getenv("JOB_STORE_SEARCH_LIMIT", "100"))
+
+# Ranking: share of the text relevance that comes from the title, the resume/job cosine
+# that already counts as a full match, how much skill coverage weighs in the final score,
+# and how many pseudo-skills (scored at the text match) smooth coverage for postings that
+# name only one or two skills.
+TITLE_BOOST = 0.3
+RELEVANCE_FULL = 0.35
+SKILL_WEIGHT = 0.55
+SKILL_PRIOR = 2.0
+
+_client = None
+adzuna_search_cache = StaleWhileRevalidateCache(ADZUNA_CACHE_TTL, ADZUNA_CACHE_STALE_TTL, ADZUNA_CACHE_MAX_ENTRIES)
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(ADZUNA_TIMEOUT),
+            limits=httpx.Limits(max_connections=ADZUNA_MAX_CONCURRENCY * 2, max_keepalive_connections=ADZUNA_MAX_CONCURRENCY),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 async def get_search_keywords(resume_text: str):
     system_prompt = """
@@ -15,93 +69,243 @@ async def get_search_keywords(resume_text: str):
     """
     
     try:
-        completion = groq_client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": resume_text[:3000]}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            response_format={"type": "json_object"}
-        )
+        with stage("llm_keywords"):
+            completion = await llm_gateway.chat_completion(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": compact_resume(resume_text, KEYWORDS_TOKEN_BUDGET, label="keywords")}
+                ],
+                model=GROQ_MODEL,
+                temperature=0,
+                response_format={"type": "json_object"}
+            )
         data = json.loads(completion.choices[0].message.content)
         return data.get("role", ""), data.get("skills", [])
     except Exception as e:
         print(f"Keyword extraction failed: {e}")
         return "", []
 
-async def fetch_jobs(role: str, skills: list, location: str = "India"):
-    if not ADZUNA_APP_ID or "PLACEHOLDER" in ADZUNA_APP_ID:
-        return get_mock_jobs()
+def country_for(location: str) -> str:
+    country_code = "in"
+    if location.lower() in ["us", "usa", "united states"]: country_code = "us"
+    elif location.lower() in ["uk", "united kingdom"]: country_code = "gb"
+    return country_code
 
-    what_query = f"{role} {' '.join(skills[:2])}"
-    
+
+def build_searches(role: str, skills: list, location: str = "India"):
+    # [(country_code, what, where, page)]: the role alone, the role with each top skill,
+    # for every ';'-separated location and the first ADZUNA_PAGES pages.
+    role = (role or "").strip()
+    top_skills = [s.strip() for s in skills[:ADZUNA_QUERY_SKILLS] if s and s.strip()]
+    queries = [role] if role else []
+    queries += [f"{role} {skill}".strip() for skill in top_skills]
+    queries = list(dict.fromkeys(q for q in queries if q))
+
+    wheres = [w.strip() for w in (location or "").split(";") if w.strip()] or ["India"]
+    return [
+        (country_for(where), what, where, page)
+        for where in wheres
+        for what in queries
+        for page in range(1, ADZUNA_PAGES + 1)
+    ]
+
+
+async def search_adzuna(country_code: str, what: str, where: str, page: int = 1):
     params = {
         "app_id": ADZUNA_APP_ID,
         "app_key": ADZUNA_APP_KEY,
-        "results_per_page": 10,
-        "what": what_query,
-        "where": location,
+        "results_per_page": ADZUNA_RESULTS_PER_PAGE,
+        "what": what,
+        "where": where,
         "content-type": "application/json"
     }
-    
-    country_code = "in"
-    if location.lower() in ["us", "usa", "united states"]: country_code = "us"
-    elif location.lower() in ["uk", "united kingdom"]: country_code = "gb"
-    
-    print(f"Adzuna Query: {what_query} in {location} (Country: {country_code})")
-    print(f"Adzuna Params: {params}")
-    
-    url = f"{ADZUNA_BASE_URL}/{country_code}/search/1"
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, params=params)
-            
-            if resp.status_code != 200:
-                print(f"Adzuna API Error {resp.status_code}: {resp.text}")
-                return get_mock_jobs(role)
-            
-            data = resp.json()
-            results = data.get("results", [])
-            print(f"Adzuna Results Found: {len(results)}")
-            
-            if not results:
-                print("No results found. Returning mock data.")
-                return get_mock_jobs(role)
-                
-            return transform_adzuna_results(results, skills)
-        except Exception as e:
-            print(f"Adzuna Exception: {e}")
-            return get_mock_jobs(role)
-
-def transform_adzuna_results(results, user_skills):
-    transformed = []
-    user_skills_set = {s.lower() for s in user_skills}
-    
+    url = f"{ADZUNA_BASE_URL}/{country_code}/search/{page}"
+    with stage("adzuna_request"):
+        resp = await get_client().get(url, params=params)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Adzuna API Error {resp.status_code}: {resp.text[:200]}")
+    return resp.json().get("results", [])
+
+
+def search_key(country_code: str, what: str, where: str, page: int):
+    return (country_code.lower(), " ".join(what.lower().split()), " ".join(where.lower().split()), int(page))
+
+
+async def cached_search_adzuna(country_code: str, what: str, where: str, page: int = 1):
+    key = search_key(country_code, what, where, page)
+    return await adzuna_search_cache.get_or_fetch(key, lambda: search_adzuna(*key))
+
+
+async def run_searches(searches):
+    # Returns (results, failed_count). Whatever finished inside ADZUNA_DEADLINE is kept.
+    semaphore = asyncio.Semaphore(ADZUNA_MAX_CONCURRENCY)
+
+    async def limited(search):
+        async with semaphore:
+            return await cached_search_adzuna(*search)
+
+    tasks = [asyncio.create_task(limited(search)) for search in searches]
+    with stage("adzuna_fanout"):
+        done, pending = await asyncio.wait(tasks, timeout=ADZUNA_DEADLINE)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    failed = len(pending)
+    for search, task in zip(searches, tasks):
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            failed += 1
+            print(f"Adzuna search {search} failed: {task.exception()!r}")
+            continue
+        results.extend(dict(job, country=search[0]) for job in task.result())
+    return results, failed
+
+
+def dedupe_results(results):
+    # First occurrence wins, so results from earlier (more specific) searches are kept.
+    seen_ids = set()
+    seen_keys = set()
+    unique = []
     for job in results:
-        description = job.get("description", "").lower()
-        title = job.get("title", "").lower()
-        combined_text = f"{title} {description}"
-        
-        matched_count = sum(1 for s in user_skills_set if s in combined_text)
-        total_skills = len(user_skills_set) if user_skills_set else 1
-        match_percentage = min(95, int((matched_count / total_skills) * 100) + 40)
-        
-        missing = [s for s in user_skills_set if s not in combined_text]
-        
+        job_id = job.get("id")
+        key = near_duplicate_key(job)
+        if (job_id and job_id in seen_ids) or key in seen_keys:
+            continue
+        if job_id:
+            seen_ids.add(job_id)
+        seen_keys.add(key)
+        unique.append(job)
+    return unique
+
+
+async def fetch_jobs(role: str, skills: list, location: str = "India", resume_text: str = ""):
+    if not ADZUNA_APP_ID or "PLACEHOLDER" in ADZUNA_APP_ID:
+        adzuna_mock_fallbacks.inc("no_credentials")
+        return get_mock_jobs()
+
+    searches = build_searches(role, skills, location)
+    if not searches:
+        # no role and no skills (e.g. keyword extraction failed): nothing to ask Adzuna
+        adzuna_mock_fallbacks.inc("no_keywords")
+        return get_mock_jobs(role or "Developer")
+    queries = list(dict.fromkeys(what for _, what, _, _ in searches))
+    print(f"Adzuna fan-out: {len(searches)} searches for {queries} in {location}")
+
+    results, failed = await run_searches(searches)
+    jobs = dedupe_results(results)
+    print(f"Adzuna Results Found: {len(results)} ({len(jobs)} unique, {failed}/{len(searches)} searches failed)")
+
+    if not jobs:
+        print("No results found. Returning mock data.")
+        adzuna_mock_fallbacks.inc("no_results")
+        return get_mock_jobs(role)
+
+    try:
+        with stage("job_store_ingest"):
+            added = await run_in_threadpool(job_store.ingest, jobs)
+        print(f"Job store: {added} new postings ingested")
+    except Exception as e:
+        print(f"Job store ingest failed: {e}")
+
+    ranked = await run_in_threadpool(transform_adzuna_results, jobs, skills, resume_text)
+    return ranked[:ADZUNA_MAX_RESULTS]
+
+
+async def search_local_jobs(role: str, skills: list, location: str = "India"):
+    wheres = [w.strip() for w in (location or "").split(";") if w.strip()] or ["India"]
+    found = []
+    with stage("job_store_search"):
+        for where in wheres:
+            found += await run_in_threadpool(
+                job_store.search, role, skills[:ADZUNA_QUERY_SKILLS + 3], country_for(where), where, JOB_STORE_SEARCH_LIMIT
+            )
+    return dedupe_results(found)
+
+
+async def find_jobs(role: str, skills: list, location: str = "India", resume_text: str = ""):
+    # Returns (jobs, source). The local store answers when enough postings match the role; otherwise
+    # Adzuna is asked (and feeds the store). If Adzuna has nothing, thin local matches
+    # still beat the mock listings.
+    try:
+        local = await search_local_jobs(role, skills, location)
+    except Exception as e:
+        print(f"Job store search failed: {e}")
+        local = []
+
+    if len(local) >= JOB_STORE_MIN_RESULTS:
+        job_store.local_served += 1
+        print(f"Job store: serving {len(local)} local matches")
+        ranked = await run_in_threadpool(transform_adzuna_results, local, skills, resume_text)
+        return ranked[:ADZUNA_MAX_RESULTS], "local"
+
+    job_store.fallbacks += 1
+    jobs = await fetch_jobs(role, skills, location, resume_text)
+    if local and jobs and jobs[0].get("source") == "Adzuna (Mock)":
+        ranked = await run_in_threadpool(transform_adzuna_results, local, skills, resume_text)
+        return ranked[:ADZUNA_MAX_RESULTS], "local"
+    return jobs, "adzuna"
+
+def relevance_scores(query_text: str, titles, texts):
+    # Cosine of every posting against the query in one sparse product, with the title
+    # scored separately and blended in so a matching job title counts for more.
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+    try:
+        matrix = vectorizer.fit_transform(list(texts) + [query_text])
+    except ValueError:  # empty vocabulary
+        return np.zeros(len(texts))
+    query = matrix[-1].T
+    body = (matrix[:-1] @ query).toarray().ravel()
+    title = (vectorizer.transform(titles) @ query).toarray().ravel()
+    return (1 - TITLE_BOOST) * body + TITLE_BOOST * title
+
+
+@timed("job_rank")
+def transform_adzuna_results(results, user_skills, resume_text: str = ""):
+    if not results:
+        return []
+    unique_skills = list(dict.fromkeys(s.strip() for s in user_skills if s and s.strip()))
+    titles = [clean_title(job.get("title", "")) for job in results]
+    texts = [f"{title} {job.get('description', '')}" for title, job in zip(titles, results)]
+
+    relevance = relevance_scores(resume_text or " ".join(unique_skills), titles, texts)
+
+    # Skills each posting asks for (taxonomy + the extracted skills) vs. what the resume has.
+    matcher = taxonomy_matcher_with(tuple(unique_skills))
+    job_skills, names = matcher.occurrence_matrix(texts)
+    column = {name: i for i, name in enumerate(names)}
+    resume_skills = set(matcher.extract(resume_text)) if resume_text else set()
+    resume_skills.update(matcher.canonical_name(s) for s in unique_skills)
+    have = np.zeros(len(names), dtype=np.float32)
+    have[[column[s] for s in resume_skills if s in column]] = 1.0
+
+    required = np.asarray(job_skills.sum(axis=1)).ravel()
+    matched = job_skills @ have
+    text_match = np.minimum(1.0, relevance / RELEVANCE_FULL)
+    coverage = (matched + SKILL_PRIOR * text_match) / (required + SKILL_PRIOR)
+    scores = 100 * (SKILL_WEIGHT * coverage + (1 - SKILL_WEIGHT) * text_match)
+
+    # Missing skills, most in-demand across this result set first.
+    missing_matrix = job_skills.multiply(1.0 - have).tocsr()
+    missing_matrix.eliminate_zeros()
+    demand = np.asarray(job_skills.sum(axis=0)).ravel()
+
+    transformed = []
+    for i in np.argsort(-scores, kind="stable"):
+        job = results[i]
+        cols = missing_matrix.indices[missing_matrix.indptr[i]:missing_matrix.indptr[i + 1]]
+        cols = cols[np.argsort(-demand[cols], kind="stable")]
         transformed.append({
-            "job_title": job.get("title", "Unknown Role").replace("<strong>", "").replace("</strong>", ""),
+            "job_title": titles[i] or "Unknown Role",
             "company": job.get("company", {}).get("display_name", "Confidential"),
             "location": job.get("location", {}).get("display_name", "Remote/India"),
-            "match_percentage": match_percentage,
-            "missing_skills": missing[:3],
+            "match_percentage": int(round(scores[i])),
+            "missing_skills": [names[c] for c in cols[:3]],
             "apply_url": job.get("redirect_url"),
             "source": "Adzuna",
             "description": job.get("description", "")[:200] + "..."
         })
-        
-    transformed.sort(key=lambda x: x["match_percentage"], reverse=True)
     return transformed
 
 def get_mock_jobs(query="Developer"):
@@ -1,22 +1,27 @@
-import os
+import re
 import json
-from groq import Groq
+from contextlib import aclosing
+from starlette.concurrency import run_in_threadpool
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise RuntimeError("GROQ_API_KEY not found in environment variables")
+from .streaming import IncrementalJSONObjectParser
+from .llm_cache import llm_result_cache, llm_cache_key
+from .llm_gateway import llm_gateway
+from .prompt_compaction import compact_resume, compact_job_description
+from .fast_ats import score_resume_locally
+from .metrics import stage, llm_json_fallbacks
 
-client = Groq(api_key=GROQ_API_KEY)
+GROQ_MODEL = "llama-3.3-70b-versatile"
+# Bump when the ATS system prompt or its output schema changes so stale cached analyses are not served.
+ATS_PROMPT_VERSION = "ats-v2"
+NARRATIVE_PROMPT_VERSION = "narrative-v1"
+NARRATIVE_FIELDS = ("strengths", "weaknesses", "improvement_suggestions")
+# Top-level keys of ATS_SYSTEM_PROMPT's schema; a streamed analysis missing any is not cached.
+ATS_RESULT_FIELDS = (
+    "ats_score", "section_scores", "skills_match_percentage", "missing_skills", "strengths",
+    "weaknesses", "ats_warnings", "improvement_suggestions", "final_verdict",
+)
 
-
-def analyze_resume_with_groq(resume_text: str, job_description: str):
-    if not job_description or len(job_description.strip()) < 50:
-        return {"error": "Job description is required and must be at least 50 characters."}
-
-    if not resume_text or len(resume_text.strip()) < 50:
-        return {"error": "Resume text is too short or empty."}
-
-    system_prompt = """
+ATS_SYSTEM_PROMPT = """
 You are a strict, enterprise-grade Applicant Tracking System (ATS).
 
 RULES:
@@ -48,63 +53,7 @@ OUTPUT JSON FORMAT ONLY:
 }
 """.strip()
 
-    user_prompt = f"""
-RESUME:
-{resume_text}
-
-JOB DESCRIPTION:
-{job_description}
-""".strip()
-
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.1,
-            max_tokens=2000,
-            response_format={"type": "json_object"}
-        )
-
-        content = response.choices[0].message.content
-
-        try:
-            cleaned_content = content.replace("```json", "").replace("```", "").strip()
-            return json.loads(cleaned_content)
-        except json.JSONDecodeError:
-            try:
-                import re
-                match = re.search(r"\{.*\}", content, re.DOTALL)
-                if match:
-                    return json.loads(match.group(0))
-            except:
-                pass
-            
-            return {
-                "error": "AI response was not valid JSON",
-                "raw_response": content
-            }
-
-    except Exception as e:
-        return {
-            "error": "Groq API call failed",
-            "details": str(e)
-        }
-
-
-def generate_resume_with_groq(data: dict):
-    job_description = data.get("job_description", "")
-    if len(job_description.strip()) < 50:
-        return {"error": "Job description must be at least 50 characters."}
-    
-    required_fields = ["full_name", "target_job_title", "skills", "work_experience", "education"]
-    for field in required_fields:
-        if not data.get(field):
-             return {"error": f"Missing required field: {field.replace('_', ' ').title()}"}
-
-    system_prompt = """
+GENERATE_SYSTEM_PROMPT = """
 You are a professional resume writer and an Applicant Tracking System (ATS).
 
 Rules:
@@ -139,6 +88,169 @@ OUTPUT FORMAT (STRICT JSON):
 }
 """.strip()
 
+NARRATIVE_SYSTEM_PROMPT = """
+You are a senior technical recruiter reviewing a resume against a Job Description (JD).
+The numeric ATS scores have already been computed; you are given them for context only.
+Write specific, evidence-based feedback. Do NOT restate the scores.
+
+OUTPUT JSON FORMAT ONLY:
+{
+  "strengths": [string],
+  "weaknesses": [string],
+  "improvement_suggestions": [string]
+}
+""".strip()
+
+
+def validate_ats_inputs(resume_text: str, job_description: str):
+    if not job_description or len(job_description.strip()) < 50:
+        return "Job description is required and must be at least 50 characters."
+
+    if not resume_text or len(resume_text.strip()) < 50:
+        return "Resume text is too short or empty."
+    return None
+
+
+def ats_request(resume_text: str, job_description: str) -> dict:
+    user_prompt = f"""
+RESUME:
+{compact_resume(resume_text)}
+
+JOB DESCRIPTION:
+{compact_job_description(job_description)}
+""".strip()
+
+    return dict(
+        model=GROQ_MODEL,
+        messages=[
+            {"role": "system", "content": ATS_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.1,
+        max_tokens=2000,
+    )
+
+
+def ats_cache_key(resume_text: str, job_description: str) -> str:
+    return llm_cache_key(GROQ_MODEL, ATS_PROMPT_VERSION, resume_text, job_description)
+
+
+def parse_json_content(content: str):
+    try:
+        cleaned_content = content.replace("```json", "").replace("```", "").strip()
+        return json.loads(cleaned_content)
+    except json.JSONDecodeError:
+        try:
+            match = re.search(r"\{.*\}", content, re.DOTALL)
+            if match:
+                result = json.loads(match.group(0))
+                llm_json_fallbacks.inc("recovered")
+                return result
+        except:
+            pass
+    llm_json_fallbacks.inc("failed")
+    return None
+
+
+async def analyze_resume_with_groq(resume_text: str, job_description: str, use_cache: bool = True):
+    error = validate_ats_inputs(resume_text, job_description)
+    if error:
+        return {"error": error}
+
+    cache_key = ats_cache_key(resume_text, job_description)
+    if use_cache:
+        cached = llm_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        with stage("llm_ats"):
+            response = await llm_gateway.chat_completion(
+                **ats_request(resume_text, job_description),
+                response_format={"type": "json_object"}
+            )
+
+        content = response.choices[0].message.content
+        result = parse_json_content(content)
+
+        if isinstance(result, dict):
+            if "error" not in result:
+                llm_result_cache.set(cache_key, result)
+            return result
+
+        return {
+            "error": "AI response was not valid JSON",
+            "raw_response": content
+        }
+
+    except Exception as e:
+        return {
+            "error": "Groq API call failed",
+            "details": str(e)
+        }
+
+
+async def analyze_resume_hybrid(resume_text: str, job_description: str, use_cache: bool = True):
+    # Scores come from the local scorer; Groq only writes the narrative fields.
+    error = validate_ats_inputs(resume_text, job_description)
+    if error:
+        return {"error": error}
+
+    result = await run_in_threadpool(score_resume_locally, resume_text, job_description)
+
+    cache_key = llm_cache_key(GROQ_MODEL, NARRATIVE_PROMPT_VERSION, resume_text, job_description)
+    narrative = llm_result_cache.get(cache_key) if use_cache else None
+    if narrative is None:
+        scores = {k: result[k] for k in ("ats_score", "section_scores", "skills_match_percentage", "missing_skills")}
+        user_prompt = f"""
+COMPUTED SCORES:
+{json.dumps(scores)}
+
+RESUME:
+{compact_resume(resume_text)}
+
+JOB DESCRIPTION:
+{compact_job_description(job_description)}
+""".strip()
+        try:
+            with stage("llm_narrative"):
+                response = await llm_gateway.chat_completion(
+                    model=GROQ_MODEL,
+                    messages=[
+                        {"role": "system", "content": NARRATIVE_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.1,
+                    max_tokens=800,
+                    response_format={"type": "json_object"}
+                )
+            narrative = parse_json_content(response.choices[0].message.content)
+        except Exception as e:
+            print(f"Hybrid narrative failed, keeping local feedback: {e}")
+            narrative = None
+        if isinstance(narrative, dict):
+            narrative = {k: narrative[k] for k in NARRATIVE_FIELDS if isinstance(narrative.get(k), list)}
+            if narrative:
+                llm_result_cache.set(cache_key, narrative)
+
+    if isinstance(narrative, dict):
+        result.update(narrative)
+    return result
+
+
+def validate_generate_inputs(data: dict):
+    job_description = data.get("job_description", "")
+    if len(job_description.strip()) < 50:
+        return "Job description must be at least 50 characters."
+    
+    required_fields = ["full_name", "target_job_title", "skills", "work_experience", "education"]
+    for field in required_fields:
+        if not data.get(field):
+             return f"Missing required field: {field.replace('_', ' ').title()}"
+    return None
+
+
+def generate_request(data: dict) -> dict:
     user_prompt = f"""
 USER DETAILS:
 Name: {data.get('full_name')}
@@ -162,35 +274,92 @@ CERTIFICATIONS:
 {data.get('certifications', 'None')}
 
 TARGET JOB DESCRIPTION:
-{job_description}
+{compact_job_description(data.get('job_description', ''))}
 """.strip()
 
+    return dict(
+        model=GROQ_MODEL,
+        messages=[
+            {"role": "system", "content": GENERATE_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.2,
+        max_tokens=3000,
+    )
+
+
+async def generate_resume_with_groq(data: dict):
+    error = validate_generate_inputs(data)
+    if error:
+        return {"error": error}
+
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2,
-            max_tokens=3000,
-            response_format={"type": "json_object"}
-        )
+        with stage("llm_generate"):
+            response = await llm_gateway.chat_completion(
+                **generate_request(data),
+                response_format={"type": "json_object"}
+            )
 
         content = response.choices[0].message.content
-
-        try:
-            cleaned_content = content.replace("```json", "").replace("```", "").strip()
-            return json.loads(cleaned_content)
-        except json.JSONDecodeError:
-            try:
-                import re
-                match = re.search(r"\{.*\}", content, re.DOTALL)
-                if match:
-                    return json.loads(match.group(0))
-            except:
-                pass
-            return {"error": "Failed to generate valid JSON resume"}
+        result = parse_json_content(content)
+        if result is not None:
+            return result
+        return {"error": "Failed to generate valid JSON resume"}
 
     except Exception as e:
         return {"error": f"Generation failed: {str(e)}"}
+
+
+async def _stream_json_events(request: dict, stream_fields=()):
+    # JSON mode is not combined with streaming; the prompts already demand raw JSON
+    # and the incremental parser skips anything before the opening brace.
+    parser = IncrementalJSONObjectParser(stream_fields)
+    async with aclosing(llm_gateway.stream_chat_completion(**request)) as deltas:
+        async for delta in deltas:
+            for kind, key, value in parser.feed(delta):
+                if kind == "delta":
+                    yield "delta", {"key": key, "text": value}
+                else:
+                    yield "field", {"key": key, "value": value}
+            if parser.finished:
+                break
+    if not parser.finished:
+        raise ValueError("AI response ended before the JSON object was complete")
+    yield "done", parser.result
+
+
+async def stream_resume_analysis(resume_text: str, job_description: str, use_cache: bool = True):
+    # Async generator of (event, data) pairs for the SSE variant of /analyze_ats.
+    error = validate_ats_inputs(resume_text, job_description)
+    if error:
+        yield "error", {"error": error}
+        return
+
+    cache_key = ats_cache_key(resume_text, job_description)
+    cached = llm_result_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        for key, value in cached.items():
+            yield "field", {"key": key, "value": value}
+        yield "done", cached
+        return
+
+    try:
+        async for event, data in _stream_json_events(ats_request(resume_text, job_description)):
+            if event == "done" and all(k in data for k in ATS_RESULT_FIELDS):
+                llm_result_cache.set(cache_key, data)
+            yield event, data
+    except Exception as e:
+        yield "error", {"error": "Groq API call failed", "details": str(e)}
+
+
+async def stream_resume_generation(data: dict):
+    error = validate_generate_inputs(data)
+    if error:
+        yield "error", {"error": error}
+        return
+
+    try:
+        async for event, payload in _stream_json_events(generate_request(data), stream_fields=("resume_text",)):
+            yield event, payload
+    except Exception as e:
+        yield "error", {"error": f"Generation failed: {str(e)}"}
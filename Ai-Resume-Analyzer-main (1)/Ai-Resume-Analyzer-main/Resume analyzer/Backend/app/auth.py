@@ -0,0 +1,218 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import jwt
+from starlette.concurrency import run_in_threadpool
+
+from .supabase_client import supabase, SUPABASE_URL
+
+# Legacy Supabase projects sign access tokens with this HS256 secret; newer ones publish
+# asymmetric keys at the JWKS endpoint. With neither usable, tokens go to /auth/v1/user.
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWT_ISSUER = os.getenv("SUPABASE_JWT_ISSUER")  # checked only when set
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "1") == "1"
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+JWKS_RETRY_INTERVAL = float(os.getenv("JWKS_RETRY_INTERVAL", "300"))
+# app_metadata roles allowed to search other users' resumes (/candidates/rank).
+RECRUITER_ROLES = frozenset(r.strip() for r in os.getenv("RECRUITER_ROLES", "recruiter,admin").split(",") if r.strip())
+
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+
+class AuthError(Exception):
+    pass
+
+
+class LocalVerificationUnavailable(Exception):
+    # No key we can check this token with; only the remote check can decide.
+    pass
+
+
+class TokenCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        # (user_id, roles) or None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user_id, roles = entry
+            if expires_at < time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user_id, roles
+
+    def set(self, token, user_id, expires_at, roles=frozenset()):
+        with self._lock:
+            self._entries[token] = (expires_at, user_id, roles)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TokenVerifier:
+    def __init__(self, secret=None, jwks_url=None, audience="authenticated", issuer=None):
+        self.secret = secret
+        self.audience = audience
+        self.issuer = issuer
+        self.jwks = jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=3600) if jwks_url else None
+        self._jwks_down_until = 0.0
+
+    def _decode(self, token, key, algorithms):
+        options = {"require": ["exp", "sub"]}
+        try:
+            return jwt.decode(
+                token, key, algorithms=algorithms, audience=self.audience,
+                issuer=self.issuer, options=options, leeway=10,
+            )
+        except jwt.ExpiredSignatureError:
+            raise AuthError("Token has expired")
+        except jwt.InvalidAudienceError:
+            raise AuthError("Token audience is not accepted")
+        except (jwt.PyJWTError, TypeError, ValueError) as e:
+            # also a key that can't verify this token: PyJWT raises InvalidKeyError,
+            # or TypeError/ValueError when the key type doesn't match the algorithm
+            raise AuthError(f"Invalid token: {e}")
+
+    def needs_network(self, token) -> bool:
+        # True when verifying may fetch the JWKS document (so it should leave the event loop).
+        return self._algorithm(token) != "HS256" and self.jwks is not None
+
+    def _algorithm(self, token):
+        try:
+            return jwt.get_unverified_header(token).get("alg")
+        except jwt.PyJWTError as e:
+            raise AuthError(f"Invalid token: {e}")
+
+    def verify(self, token) -> dict:
+        alg = self._algorithm(token)
+        if alg == "HS256":
+            if not self.secret:
+                raise LocalVerificationUnavailable("SUPABASE_JWT_SECRET is not set")
+            return self._decode(token, self.secret, ["HS256"])
+
+        if alg not in ASYMMETRIC_ALGORITHMS:
+            raise AuthError(f"Unsupported token algorithm: {alg}")
+        if self.jwks is None or time.time() < self._jwks_down_until:
+            raise LocalVerificationUnavailable("JWKS is not available")
+        try:
+            key = self.jwks.get_signing_key_from_jwt(token).key
+        except jwt.PyJWKClientConnectionError as e:
+            self._jwks_down_until = time.time() + JWKS_RETRY_INTERVAL
+            print(f"JWKS fetch failed, retrying in {JWKS_RETRY_INTERVAL:g}s: {e}")
+            raise LocalVerificationUnavailable(str(e))
+        except jwt.PyJWKClientError as e:
+            # no signing keys published, or none matching this token's kid
+            raise LocalVerificationUnavailable(str(e))
+        except jwt.PyJWTError as e:
+            # malformed kid header, or a published key PyJWT can't load
+            raise AuthError(f"Invalid token: {e}")
+        return self._decode(token, key, ASYMMETRIC_ALGORITHMS)
+
+
+def token_roles(app_metadata) -> frozenset:
+    # Roles come from app_metadata, which only the service role can write; user_metadata
+    # is editable by the user and must never grant access.
+    if not isinstance(app_metadata, dict):
+        return frozenset()
+    roles = app_metadata.get("roles") or []
+    if isinstance(roles, str):
+        roles = [roles]
+    if app_metadata.get("role"):
+        roles = list(roles) + [app_metadata["role"]]
+    return frozenset(str(r) for r in roles)
+
+
+async def _remote_user(token):
+    user_response = await supabase.auth.aget_user(token)
+    if not user_response or not user_response.user:
+        raise AuthError("Invalid token")
+    return user_response.user.id, token_roles(user_response.user.app_metadata)
+
+
+def _token_expiry(token):
+    try:
+        return jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+
+
+class Authenticator:
+    def __init__(self, verifier, cache, remote_fallback=True, ttl=60):
+        self.verifier = verifier
+        self.cache = cache
+        self.remote_fallback = remote_fallback
+        self.ttl = ttl
+        self.cache_hits = 0
+        self.local_verified = 0
+        self.remote_verified = 0
+        self.rejected = 0
+
+    async def authenticate(self, token: str) -> str:
+        user_id, _ = await self.authorize(token)
+        return user_id
+
+    async def authorize(self, token: str):
+        # (user_id, roles) for a valid token; raises AuthError otherwise.
+        cached = self.cache.get(token)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        try:
+            try:
+                if self.verifier.needs_network(token):
+                    claims = await run_in_threadpool(self.verifier.verify, token)
+                else:
+                    claims = self.verifier.verify(token)
+                user_id = claims["sub"]
+                expires_at = claims["exp"]
+                roles = token_roles(claims.get("app_metadata"))
+                self.local_verified += 1
+            except LocalVerificationUnavailable as e:
+                if not self.remote_fallback:
+                    raise AuthError(f"Token cannot be verified locally: {e}")
+                user_id, roles = await _remote_user(token)
+                expires_at = _token_expiry(token)
+                self.remote_verified += 1
+        except AuthError:
+            self.rejected += 1
+            raise
+
+        # never cache past the token's own expiry
+        expires_at = min(time.time() + self.ttl, expires_at or float("inf"))
+        self.cache.set(token, user_id, expires_at, roles)
+        return user_id, roles
+
+    def stats(self) -> dict:
+        return {
+            "hs256_secret": bool(self.verifier.secret),
+            "jwks": self.verifier.jwks is not None,
+            "remote_fallback": self.remote_fallback,
+            "cache_hits": self.cache_hits,
+            "local_verified": self.local_verified,
+            "remote_verified": self.remote_verified,
+            "rejected": self.rejected,
+            "cached_tokens": len(self.cache),
+        }
+
+
+authenticator = Authenticator(
+    TokenVerifier(SUPABASE_JWT_SECRET, SUPABASE_JWKS_URL, SUPABASE_JWT_AUDIENCE, SUPABASE_JWT_ISSUER),
+    TokenCache(AUTH_CACHE_MAX_ENTRIES),
+    AUTH_REMOTE_FALLBACK,
+    AUTH_CACHE_TTL,
+)
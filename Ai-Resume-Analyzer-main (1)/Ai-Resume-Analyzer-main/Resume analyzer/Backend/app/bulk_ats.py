@@ -0,0 +1,179 @@
+import os
+import asyncio
+import hashlib
+import zipfile
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from .ingest import ingest_upload, IngestedUpload, MAX_UPLOAD_BYTES
+from .pdf_executor import extract_text_async, PDFExtractionError, PDF_WORKERS
+from .ats import analyze_resume_with_groq, analyze_resume_hybrid
+from .fast_ats import score_resume_locally
+
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "200"))
+BULK_MAX_ARCHIVE_BYTES = int(os.getenv("BULK_MAX_ARCHIVE_BYTES", str(50 * 1024 * 1024)))
+# Decompressed size across every archive in one request; zips of padding compress ~1000:1.
+BULK_MAX_UNPACKED_BYTES = int(os.getenv("BULK_MAX_UNPACKED_BYTES", str(200 * 1024 * 1024)))
+# Kept below LLM_MAX_CONCURRENCY so one bulk screen can't take every Groq slot.
+BULK_LLM_CONCURRENCY = int(os.getenv("BULK_LLM_CONCURRENCY", "4"))
+
+RESUME_EXTENSIONS = (".pdf", ".txt")
+SUMMARY_FIELDS = ("ats_score", "final_verdict", "skills_match_percentage", "section_scores", "missing_skills")
+
+
+def _failure(filename: str, error: str) -> dict:
+    return {"filename": filename, "status": "failed", "error": error}
+
+
+def _too_many_files():
+    return HTTPException(status_code=413, detail=f"At most {BULK_MAX_FILES} resumes per screen.")
+
+
+def _too_large():
+    return HTTPException(status_code=413, detail="Archives are too large once unpacked.")
+
+
+def _is_skipped(info) -> bool:
+    name = info.filename
+    base = os.path.basename(name)
+    return info.is_dir() or name.startswith("__MACOSX/") or not base or base.startswith(".")
+
+
+def unpack_archive(upload: IngestedUpload, max_files: int = BULK_MAX_FILES, max_bytes: int = BULK_MAX_UNPACKED_BYTES):
+    # Returns (resumes, failures, bytes unpacked). Entry sizes are checked on the bytes
+    # actually read, not the size the zip header claims; the entry count is checked
+    # before anything is decompressed.
+    try:
+        archive = zipfile.ZipFile(upload.stream())
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"{upload.filename} is not a valid zip archive.")
+
+    resumes, failures = [], []
+    unpacked = 0
+    with archive:
+        entries = [info for info in archive.infolist() if not _is_skipped(info)]
+        if len(entries) > max_files:
+            raise _too_many_files()
+        for info in entries:
+            name = info.filename
+            base = os.path.basename(name)
+            if not base.lower().endswith(RESUME_EXTENSIONS):
+                failures.append(_failure(name, "Unsupported file type; only PDF and TXT resumes are screened."))
+                continue
+            if info.file_size > MAX_UPLOAD_BYTES:
+                failures.append(_failure(name, "File exceeds the upload limit."))
+                continue
+            try:
+                with archive.open(info) as f:
+                    content = f.read(min(MAX_UPLOAD_BYTES, max_bytes - unpacked) + 1)
+            except Exception as e:
+                failures.append(_failure(name, f"Could not read from archive: {e}"))
+                continue
+            unpacked += len(content)
+            if unpacked > max_bytes:
+                raise _too_large()
+            if len(content) > MAX_UPLOAD_BYTES:
+                failures.append(_failure(name, "File exceeds the upload limit."))
+                continue
+            resumes.append(IngestedUpload(name, content, hashlib.sha256(content).hexdigest()))
+    return resumes, failures, unpacked
+
+
+async def collect_resumes(files):
+    resumes, failures = [], []
+    unpacked_bytes = 0
+    for file in files:
+        filename = file.filename or ""
+        if filename.lower().endswith(".zip"):
+            upload = await ingest_upload(file, max_bytes=BULK_MAX_ARCHIVE_BYTES)
+            unpacked, skipped, size = await run_in_threadpool(
+                unpack_archive, upload, BULK_MAX_FILES - len(resumes), BULK_MAX_UNPACKED_BYTES - unpacked_bytes
+            )
+            resumes.extend(unpacked)
+            failures.extend(skipped)
+            unpacked_bytes += size
+        elif filename.lower().endswith(RESUME_EXTENSIONS):
+            if len(resumes) >= BULK_MAX_FILES:
+                raise _too_many_files()
+            try:
+                resumes.append(await ingest_upload(file))
+            except HTTPException as e:
+                failures.append(_failure(filename, e.detail))
+        else:
+            await file.close()
+            failures.append(_failure(filename, "Unsupported file type; upload PDF, TXT or ZIP files."))
+
+    return resumes, failures
+
+
+async def _screen_one(upload: IngestedUpload, job_description: str, mode: str, use_cache: bool, parse_slots, score_slots):
+    try:
+        if upload.is_pdf:
+            # extract_text_async's deadline starts when it is called, so don't queue
+            # more PDFs than the pool has workers.
+            async with parse_slots:
+                text = await extract_text_async(upload.content, key=upload.sha256)
+        else:
+            text = upload.text()
+        if not text or len(text.strip()) < 50:
+            return _failure(upload.filename, "Unable to extract sufficient text from resume.")
+
+        if mode == "fast":
+            result = await run_in_threadpool(score_resume_locally, text, job_description)
+        else:
+            analyze = analyze_resume_hybrid if mode == "hybrid" else analyze_resume_with_groq
+            async with score_slots:
+                result = await analyze(text, job_description, use_cache=use_cache)
+    except PDFExtractionError as e:
+        return _failure(upload.filename, e.detail)
+    except Exception as e:
+        return _failure(upload.filename, f"Screening failed: {e}")
+
+    if "error" in result:
+        error = result["error"]
+        if result.get("details"):
+            error = f"{error}: {result['details']}"
+        return _failure(upload.filename, error)
+
+    row = {"filename": upload.filename, "status": "scored"}
+    row.update({k: result.get(k) for k in SUMMARY_FIELDS})
+    return row
+
+
+def rank_results(rows):
+    scored = [r for r in rows if r["status"] == "scored"]
+    scored.sort(key=lambda r: (-(r.get("ats_score") or 0), -(r.get("skills_match_percentage") or 0), r["filename"]))
+    return [dict(r, rank=i + 1) for i, r in enumerate(scored)]
+
+
+async def screen_resumes(resumes, failures, job_description: str, mode: str = "llm", use_cache: bool = True):
+    # Async generator of (event, data) pairs: a "candidate" event per resume in completion
+    # order, then "done" with the ranked table. One resume failing never stops the others.
+    for row in failures:
+        yield "candidate", row
+
+    parse_slots = asyncio.Semaphore(PDF_WORKERS)
+    score_slots = asyncio.Semaphore(BULK_LLM_CONCURRENCY)
+    tasks = [
+        asyncio.ensure_future(_screen_one(upload, job_description, mode, use_cache, parse_slots, score_slots))
+        for upload in resumes
+    ]
+    rows = list(failures)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            row = await next_done
+            rows.append(row)
+            yield "candidate", row
+    finally:
+        # client went away mid-screen: stop the remaining work
+        for task in tasks:
+            task.cancel()
+
+    failed = [r for r in rows if r["status"] != "scored"]
+    yield "done", {
+        "mode": mode,
+        "total": len(rows),
+        "scored": len(rows) - len(failed),
+        "failed": failed,
+        "ranking": rank_results(rows),
+    }
@@ -0,0 +1,80 @@
+import threading
+
+from .matcher import TfidfIndex
+
+CANDIDATE_PAGE_SIZE = 1000
+
+
+class CandidateIndex(TfidfIndex):
+    # One row per profile_resumes entry, keyed by user_id.
+
+    def document(self, row):
+        return row.get("text") or ""
+
+    def item_id(self, row):
+        return str(row["user_id"])
+
+    def format(self, row, score):
+        return {
+            "user_id": row["user_id"],
+            "filename": row.get("filename"),
+            "uploaded_at": row.get("uploaded_at"),
+            "score": round(float(score), 4),
+        }
+
+
+candidate_index = CandidateIndex(max_features=5000)
+_build_lock = threading.Lock()
+_upsert_lock = threading.Lock()
+_upserted_during_build = None  # user_id -> row while a build is paging through Supabase
+
+
+def fetch_candidate_rows(supabase):
+    rows = []
+    offset = 0
+    while True:
+        response = (
+            supabase.table("profile_resumes")
+            .select("user_id,filename,uploaded_at,text")
+            .order("user_id")
+            .limit(CANDIDATE_PAGE_SIZE)
+            .offset(offset)
+            .execute()
+        )
+        page = response.data or []
+        rows.extend(r for r in page if r.get("text"))
+        if len(page) < CANDIDATE_PAGE_SIZE:
+            return rows
+        offset += CANDIDATE_PAGE_SIZE
+
+
+def build_candidate_index(supabase):
+    global _upserted_during_build
+    with _build_lock:
+        with _upsert_lock:
+            _upserted_during_build = {}
+        try:
+            try:
+                rows = fetch_candidate_rows(supabase)
+            except Exception as e:
+                print(f"Candidate index build failed: {e}")
+                return candidate_index
+            with _upsert_lock:
+                # fit() replaces the index, so replay uploads that landed while paging;
+                # they may be newer than the page that was read for the same user.
+                merged = {str(r["user_id"]): r for r in rows}
+                merged.update(_upserted_during_build)
+                candidate_index.fit(list(merged.values()))
+            print(f"Candidate index built: {len(merged)} resumes")
+            return candidate_index
+        finally:
+            with _upsert_lock:
+                _upserted_during_build = None
+
+
+def upsert_candidate(row):
+    row = {k: row.get(k) for k in ("user_id", "filename", "uploaded_at", "text")}
+    with _upsert_lock:
+        if _upserted_during_build is not None:
+            _upserted_during_build[str(row["user_id"])] = row
+        candidate_index.upsert(row)
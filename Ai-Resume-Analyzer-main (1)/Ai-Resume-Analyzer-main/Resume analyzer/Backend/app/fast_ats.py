@@ -0,0 +1,149 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .resume_parser import parse_resume_text
+from .skill_engine import default_matcher
+from .prompt_compaction import split_sections, collapse_whitespace
+from .metrics import timed
+
+# Same caps as the section_scores in the Groq ATS prompt.
+SECTION_MAX = {"parsing": 20, "skills": 35, "experience": 25, "role_alignment": 10, "education": 10}
+
+_YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+_YEAR = re.compile(r"\b(19[89]\d|20\d\d)\b")
+_PRESENT = re.compile(r"\b(present|current|now|till date)\b", re.IGNORECASE)
+_DEGREE = re.compile(
+    r"\b(b\.?\s?tech|b\.?\s?e\b|b\.?\s?sc|bachelor|m\.?\s?tech|m\.?\s?sc|master|mba|ph\.?\s?d|degree|diploma|university|college)",
+    re.IGNORECASE,
+)
+_JD_DEGREE = re.compile(r"\b(bachelor|master|degree|b\.?\s?tech|m\.?\s?tech|ph\.?\s?d)", re.IGNORECASE)
+
+
+def text_similarity(a: str, b: str) -> float:
+    try:
+        tfidf = TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform([a, b])
+    except ValueError:  # empty vocabulary
+        return 0.0
+    return float((tfidf[0] @ tfidf[1].T).toarray()[0, 0])
+
+
+@lru_cache(maxsize=64)
+def job_description_skills(job_description: str) -> tuple:
+    return tuple(default_matcher().extract(job_description))
+
+
+def _resume_years(text: str, sections) -> float:
+    stated = [int(m) for m in _YEARS.findall(text)]
+    experience = "\n".join("\n".join(lines) for name, lines in sections if name == "experience")
+    years = [int(y) for y in _YEAR.findall(experience)]
+    if _PRESENT.search(experience):
+        years.append(datetime.now().year)
+    span = (max(years) - min(years)) if len(years) >= 2 else 0
+    return float(max(stated + [span]))
+
+
+def _verdict(score: int) -> str:
+    if score >= 85:
+        return "Strong Match"
+    if score >= 70:
+        return "Moderate Match"
+    return "Weak Match"
+
+
+@timed("fast_ats")
+def score_resume_locally(resume_text: str, job_description: str) -> dict:
+    """Deterministic ATS estimate with the same output schema as the Groq analysis."""
+    parsed = parse_resume_text(resume_text)
+    text = parsed["full_text"]
+    sections = split_sections(collapse_whitespace(text).splitlines())
+    section_names = {name for name, _ in sections if name != "header"}
+
+    jd_skills = job_description_skills(job_description)
+    resume_skills = set(parsed["skills"])
+    matched = [s for s in jd_skills if s in resume_skills]
+    missing = [s for s in jd_skills if s not in resume_skills]
+    similarity = text_similarity(text, job_description)
+
+    warnings = []
+
+    # parsing: can an ATS pull out the basics?
+    parsing = 0
+    parsing += 4 if parsed["name"] else 0
+    parsing += 4 if parsed["emails"] else 0
+    parsing += 4 if parsed["phones"] else 0
+    word_count = len(text.split())
+    parsing += 4 if 150 <= word_count <= 1500 else 2 if word_count >= 80 else 0
+    parsing += min(4, len(section_names))
+    if not parsed["emails"]:
+        warnings.append("No email address detected.")
+    if not parsed["phones"]:
+        warnings.append("No phone number detected.")
+    if len(section_names) < 3:
+        warnings.append("Few standard section headings (Skills, Experience, Education) were detected.")
+    if word_count < 150:
+        warnings.append("Resume text is very short; it may be partly image-based.")
+
+    if jd_skills:
+        skills_match = len(matched) / len(jd_skills)
+    else:
+        skills_match = min(1.0, similarity / 0.4)
+    skills = SECTION_MAX["skills"] * skills_match
+
+    required = [int(y) for y in _YEARS.findall(job_description)]
+    have = _resume_years(text, sections)
+    experience = 10 if "experience" in section_names else 0
+    if required:
+        experience += 15 * min(1.0, have / max(1, min(required)))
+    else:
+        experience += 15 * min(1.0, similarity / 0.35)
+
+    role_alignment = SECTION_MAX["role_alignment"] * min(1.0, similarity / 0.35)
+
+    has_degree = bool(_DEGREE.search(text))
+    if has_degree:
+        education = 10
+    elif "education" in section_names:
+        education = 6
+    else:
+        education = 0 if _JD_DEGREE.search(job_description) else 5
+
+    section_scores = {
+        "parsing": int(round(parsing)),
+        "skills": int(round(skills)),
+        "experience": int(round(experience)),
+        "role_alignment": int(round(role_alignment)),
+        "education": int(round(education)),
+    }
+    ats_score = sum(section_scores.values())
+
+    strengths = []
+    weaknesses = []
+    if matched:
+        strengths.append(f"Matches {len(matched)} of {len(jd_skills)} skills named in the job description: {', '.join(matched[:8])}.")
+    if missing:
+        weaknesses.append(f"Missing skills named in the job description: {', '.join(missing[:8])}.")
+    if required and have < min(required):
+        weaknesses.append(f"Job asks for {min(required)}+ years; about {int(have)} detected in the resume.")
+    if similarity >= 0.3:
+        strengths.append("Resume wording closely follows the job description.")
+    elif similarity < 0.15:
+        weaknesses.append("Resume wording has little overlap with the job description.")
+
+    suggestions = [f"Add concrete evidence of {s} if you have used it." for s in missing[:5]]
+    if len(section_names) < 3:
+        suggestions.append("Use standard headings such as Skills, Work Experience and Education.")
+
+    return {
+        "ats_score": ats_score,
+        "section_scores": section_scores,
+        "skills_match_percentage": int(round(skills_match * 100)),
+        "missing_skills": missing,
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "ats_warnings": warnings,
+        "improvement_suggestions": suggestions,
+        "final_verdict": _verdict(ats_score),
+    }
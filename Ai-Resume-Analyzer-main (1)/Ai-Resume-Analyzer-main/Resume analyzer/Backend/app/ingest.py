@@ -0,0 +1,58 @@
+import os
+import io
+import hashlib
+from fastapi import UploadFile, HTTPException
+
+from .metrics import stage
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class IngestedUpload:
+    def __init__(self, filename: str, content: bytes, sha256: str):
+        self.filename = filename
+        self.content = content
+        self.sha256 = sha256
+        self.size = len(content)
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.filename.lower().endswith(".pdf")
+
+    def stream(self):
+        return io.BytesIO(self.content)
+
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="ignore")
+
+
+async def ingest_upload(file: UploadFile, max_bytes: int = None) -> IngestedUpload:
+    with stage("upload_read"):
+        return await _read_upload(file, max_bytes)
+
+
+async def _read_upload(file: UploadFile, max_bytes: int = None) -> IngestedUpload:
+    # Reads the multipart body exactly once (Starlette already spools large parts to a
+    # temp file it deletes on close), enforcing the size cap while streaming and hashing
+    # as we go. Nothing is written to disk on our side.
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    if file.size is not None and file.size > max_bytes:
+        await file.close()
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit.")
+
+    buffer = bytearray()
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = await file.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            buffer.extend(chunk)
+            if len(buffer) > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit.")
+            digest.update(chunk)
+    finally:
+        await file.close()
+
+    return IngestedUpload(file.filename or "", bytes(buffer), digest.hexdigest())
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from .matcher import INDEX_DIR
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(INDEX_DIR, "job_store.sqlite3"))
+JOB_STORE_TTL_DAYS = float(os.getenv("JOB_STORE_TTL_DAYS", "14"))
+JOB_STORE_PURGE_INTERVAL = float(os.getenv("JOB_STORE_PURGE_INTERVAL", "600"))
+
+# bm25 column weights: title, company, location, description
+BM25_WEIGHTS = "10.0, 1.0, 0.0, 1.0"
+
+# A bare country means "anywhere in it", not a word the posting's location must contain.
+COUNTRY_NAMES = {"india", "us", "usa", "united states", "uk", "united kingdom"}
+
+# Words that make two postings of the same job look different.
+_TITLE_NOISE = {"remote", "hybrid", "onsite", "on", "site", "urgent", "hiring", "immediate", "joiner", "joiners", "wfh", "job", "opening"}
+_WORD = re.compile(r"[a-z0-9+#]+")
+_TAG = re.compile(r"<[^>]+>")
+_QUERY_STOPWORDS = {"and", "or", "not", "the", "of", "for", "with", "senior", "junior", "sr", "jr", "lead"}
+
+
+def clean_title(title: str) -> str:
+    return _TAG.sub("", title or "")
+
+
+def near_duplicate_key(job):
+    words = sorted(set(_WORD.findall(clean_title(job.get("title", "")).lower())) - _TITLE_NOISE)
+    company = " ".join(_WORD.findall(((job.get("company") or {}).get("display_name") or "").lower()))
+    return " ".join(words), company
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', " ") + '"'
+
+
+def build_match_query(role: str, skills: list, location: str = None):
+    # FTS5 MATCH expression. A posting only matches when its title has every role word
+    # (or the whole role phrase when all its words are stopwords like "Senior"); the
+    # phrase, the words and the skills in title or description then only feed bm25's
+    # ranking, so a store full of other roles never passes for local coverage.
+    role = " ".join((role or "").split())
+    if not role:
+        return None
+    words = [_phrase(w) for w in dict.fromkeys(_WORD.findall(role.lower())) if len(w) > 1 and w not in _QUERY_STOPWORDS]
+    words = [w for w in words if w.strip('" ')]
+    required = " AND ".join(words) if words else _phrase(role)
+
+    terms = [_phrase(role)] + words + [_phrase(s.strip()) for s in skills if s and s.strip()]
+    terms = list(dict.fromkeys(t for t in terms if t.strip('" ')))
+    query = f"title : ({required}) AND {{title description}} : (" + " OR ".join(terms) + ")"
+    where = " ".join((location or "").split()).lower()
+    if where and where not in COUNTRY_NAMES:
+        query += " AND location : " + _phrase(where)
+    return query
+
+
+class JobStore:
+    """Local full-text store of every posting Adzuna has returned.
+
+    Postings are deduplicated by Adzuna id and by near-duplicate title/company, and
+    expire ``ttl_days`` after they were last seen in a live search.
+    """
+
+    def __init__(self, path, ttl_days=14):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self.local_served = 0
+        self.fallbacks = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    adzuna_id TEXT UNIQUE,
+                    dedupe_key TEXT NOT NULL UNIQUE,
+                    country TEXT NOT NULL,
+                    title TEXT, company TEXT, location TEXT, description TEXT,
+                    raw TEXT NOT NULL,
+                    first_seen REAL NOT NULL, last_seen REAL NOT NULL, expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_expires ON jobs(expires_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                    title, company, location, description,
+                    content='jobs', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+                    INSERT INTO jobs_fts(rowid, title, company, location, description)
+                    VALUES (new.id, new.title, new.company, new.location, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+                    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+                    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+                    INSERT INTO jobs_fts(rowid, title, company, location, description)
+                    VALUES (new.id, new.title, new.company, new.location, new.description);
+                END;
+            """)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ingest(self, jobs, country: str = None) -> int:
+        # jobs: raw Adzuna result dicts (a "country" key overrides the argument).
+        # Returns the number of new postings.
+        now = time.time()
+        added = 0
+        conn = self._conn()
+        with conn:
+            for job in jobs:
+                title, company = near_duplicate_key(job)
+                if not title:
+                    continue
+                key = hashlib.sha1(f"{title}\x1f{company}".encode("utf-8")).hexdigest()
+                adzuna_id = str(job["id"]) if job.get("id") else None
+                row = (
+                    job.get("country") or country or "in",
+                    clean_title(job.get("title", "")),
+                    (job.get("company") or {}).get("display_name", ""),
+                    (job.get("location") or {}).get("display_name", ""),
+                    job.get("description", ""),
+                    json.dumps(job),
+                )
+                existing = conn.execute(
+                    "SELECT id FROM jobs WHERE adzuna_id = ? OR dedupe_key = ? LIMIT 1", (adzuna_id, key)
+                ).fetchone()
+                if existing:
+                    # Bumping last_seen leaves the FTS row alone; the text is only rewritten if it changed.
+                    conn.execute(
+                        "UPDATE jobs SET last_seen = ?, expires_at = ? WHERE id = ?",
+                        (now, now + self.ttl, existing[0]),
+                    )
+                    conn.execute(
+                        "UPDATE jobs SET country = ?, title = ?, company = ?, location = ?, description = ?, raw = ?"
+                        " WHERE id = ? AND (title IS NOT ? OR description IS NOT ? OR location IS NOT ?)",
+                        row + (existing[0], row[1], row[4], row[3]),
+                    )
+                    continue
+                # OR IGNORE: a concurrent ingest (another threadpool worker) may have inserted
+                # the same posting since the lookup above.
+                added += conn.execute(
+                    "INSERT OR IGNORE INTO jobs (adzuna_id, dedupe_key, country, title, company, location, description, raw,"
+                    " first_seen, last_seen, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (adzuna_id, key) + row + (now, now, now + self.ttl),
+                ).rowcount
+
+        if now - self._last_purge > JOB_STORE_PURGE_INTERVAL:
+            self.purge_expired()
+        return added
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        self._last_purge = now
+        conn = self._conn()
+        with conn:
+            removed = conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,)).rowcount
+        if removed:
+            print(f"Job store: purged {removed} expired postings")
+        return removed
+
+    def search(self, role: str, skills: list, country: str, location: str = None, limit: int = 100):
+        # Raw Adzuna dicts, best bm25 match first.
+        query = build_match_query(role, skills, location)
+        if query is None:
+            return []
+        try:
+            rows = self._conn().execute(
+                f"SELECT jobs.raw FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid"
+                f" WHERE jobs_fts MATCH ? AND jobs.country = ? AND jobs.expires_at > ?"
+                f" ORDER BY bm25(jobs_fts, {BM25_WEIGHTS}) LIMIT ?",
+                (query, country, time.time(), limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"Job store search failed for {query!r}: {e}")
+            return []
+        return [json.loads(raw) for (raw,) in rows]
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        total, live = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0) FROM jobs", (time.time(),)
+        ).fetchone()
+        return {
+            "postings": total,
+            "live_postings": live,
+            "ttl_days": self.ttl / 86400,
+            "served_locally": self.local_served,
+            "adzuna_fallbacks": self.fallbacks,
+        }
+
+
+job_store = JobStore(JOB_STORE_PATH, JOB_STORE_TTL_DAYS)
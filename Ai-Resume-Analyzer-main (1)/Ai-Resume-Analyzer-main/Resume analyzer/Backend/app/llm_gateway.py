@@ -0,0 +1,159 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+from groq import AsyncGroq, APIStatusError, APIConnectionError, APITimeoutError
+
+from .metrics import stage, record_usage
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+if not GROQ_API_KEY:
+    raise RuntimeError("GROQ_API_KEY not found in environment variables")
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+
+def _is_retryable(error) -> bool:
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """Async front door for every Groq call.
+
+    - at most ``max_concurrency`` requests are upstream at once (a stream holds its
+      slot only until Groq has accepted it);
+    - 429 / 5xx / connection errors are retried with jittered exponential backoff
+      (honouring ``Retry-After`` when Groq sends it, capped at ``LLM_BACKOFF_MAX``);
+    - identical requests issued while one is already in flight share its result.
+    """
+
+    def __init__(self, client, max_concurrency=8, max_retries=3):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._semaphore = None
+        self._inflight = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    def _get_semaphore(self):
+        # created lazily so it binds to the running loop, not the import-time one
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def request_key(kwargs) -> str:
+        payload = json.dumps(kwargs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def chat_completion(self, **kwargs):
+        key = self.request_key(kwargs)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_with_retries(kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller disconnecting must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _backoff(self, error, attempt):
+        # Returns the delay before the next attempt, or None if the error should propagate.
+        if attempt >= self.max_retries or not _is_retryable(error):
+            return None
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+            delay = delay * (0.5 + random.random() / 2)
+        else:
+            # a large Retry-After would otherwise park the request (and its client) for minutes
+            delay = min(LLM_BACKOFF_MAX, max(0.0, delay))
+        self.retries += 1
+        print(f"Groq call failed ({error.__class__.__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    async def _call_with_retries(self, kwargs):
+        attempt = 0
+        while True:
+            try:
+                async with self._get_semaphore():
+                    self.upstream_calls += 1
+                    with stage("groq_request"):
+                        completion = await self.client.chat.completions.create(**kwargs)
+                record_usage(kwargs.get("model"), getattr(completion, "usage", None))
+                return completion
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def stream_chat_completion(self, **kwargs):
+        # Async generator of content deltas. Streams are never coalesced, and are only
+        # retried while nothing has been yielded yet. The concurrency slot only covers
+        # opening the stream: a slow SSE client reading the deltas must not hold it.
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._get_semaphore():
+                    self.upstream_calls += 1
+                    stream = await self.client.chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    # Groq reports usage on the final chunk, under x_groq
+                    x_groq = getattr(chunk, "x_groq", None)
+                    if x_groq is not None:
+                        record_usage(kwargs.get("model"), getattr(x_groq, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+                return
+            except Exception as e:
+                delay = None if started else self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        await self.client.close()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._inflight),
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+        }
+
+
+# The SDK's own retry loop is disabled so backoff is handled (and counted) in one place.
+client = AsyncGroq(api_key=GROQ_API_KEY, max_retries=0, timeout=LLM_TIMEOUT)
+llm_gateway = LLMGateway(client, LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES)
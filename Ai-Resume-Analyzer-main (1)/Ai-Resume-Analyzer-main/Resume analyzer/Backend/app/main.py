@@ -1,31 +1,61 @@
-import os
 import json
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-import shutil
-from typing import Optional
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Optional, List
+from pydantic import BaseModel
 
-from .resume_parser import extract_text_from_pdf, parse_resume_text
-from .matcher import rank_jobs
-from .ats import analyze_resume_with_groq
+from .pdf_executor import extract_text_async, PDFExtractionError, shutdown_pool
+from .ingest import ingest_upload, IngestedUpload
+from .text_cache import pdf_text_cache, content_hash
+from .llm_cache import llm_result_cache
+from .llm_gateway import llm_gateway
+from .matcher import get_job_index
+from .candidate_index import candidate_index, build_candidate_index, upsert_candidate
+from .ats import analyze_resume_with_groq, analyze_resume_hybrid, stream_resume_analysis
+from .fast_ats import score_resume_locally
+from .bulk_ats import collect_resumes, screen_resumes
+from .task_queue import task_queue, TaskRejected, TaskFailed
+from .streaming import sse_stream, SSE_HEADERS
 from .supabase_client import supabase
-from .adzuna_service import get_search_keywords, fetch_jobs
-
-UPLOAD_DIR = BASE_DIR / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+from .auth import authenticator, AuthError, RECRUITER_ROLES
+from .adzuna_service import get_search_keywords, find_jobs, adzuna_search_cache, close_client as close_adzuna_client
+from .job_store import job_store
+from .profile_artifacts import profile_artifacts, compute_profile_artifacts, is_current, PROFILE_ARTIFACTS_REMOTE
+from .metrics import registry, stage, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 PROFILE_DIR = BASE_DIR / "profile_storage"
 PROFILE_DIR.mkdir(exist_ok=True)
 PROFILE_RESUME_PATH = PROFILE_DIR / "resume.pdf"
 PROFILE_METADATA_PATH = PROFILE_DIR / "metadata.json"
 
-app = FastAPI(title="Smart AI Resume Analyzer")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    supabase.open()
+    await run_in_threadpool(get_job_index)
+    # Supabase may be slow to page through; serve requests while it builds.
+    candidate_build = asyncio.create_task(run_in_threadpool(build_candidate_index, supabase))
+    task_queue.start()
+    yield
+    await task_queue.stop()
+    candidate_build.cancel()
+    shutdown_pool()
+    await llm_gateway.close()
+    await supabase.aclose()
+    await close_adzuna_client()
+
+
+app = FastAPI(title="Smart AI Resume Analyzer", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,25 +64,139 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
-async def get_current_user(authorization: Optional[str] = Header(None)):
+async def authorize(authorization: Optional[str]):
     if not authorization:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
         token = authorization.replace("Bearer ", "")
-        
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response or not user_response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        return user_response.user.id
-    except Exception as e:
+        with stage("auth"):
+            return await authenticator.authorize(token)
+    except AuthError as e:
         raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
 
 
+async def get_current_user(authorization: Optional[str] = Header(None)):
+    user_id, _ = await authorize(authorization)
+    return user_id
+
+
+async def get_recruiter(authorization: Optional[str] = Header(None)):
+    user_id, roles = await authorize(authorization)
+    if not roles & RECRUITER_ROLES:
+        raise HTTPException(status_code=403, detail="Recruiter or admin role required.")
+    return user_id
+
+
+async def task_owner(request: Request, authorization: Optional[str] = Header(None)):
+    # Fair-scheduling key for background tasks: the user when signed in, else the client address.
+    if authorization:
+        return await get_current_user(authorization)
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def extract_pdf_text(upload: IngestedUpload) -> str:
+    try:
+        with stage("pdf_extract"):
+            return await extract_text_async(upload.content, key=upload.sha256)
+    except PDFExtractionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+async def upload_text(upload: IngestedUpload) -> str:
+    return await extract_pdf_text(upload) if upload.is_pdf else upload.text()
+
+
+def read_profile_text() -> str:
+    if not PROFILE_METADATA_PATH.exists():
+        raise HTTPException(status_code=400, detail="No resume found in profile. Please upload one first.")
+
+    try:
+        with open(PROFILE_METADATA_PATH, "r") as f:
+            data = json.load(f)
+            return data.get("text", "")
+    except:
+         raise HTTPException(status_code=500, detail="Profile resume data is corrupted.")
+
+
+def check_ats_mode(mode: str):
+    if mode not in ("llm", "fast", "hybrid"):
+        raise HTTPException(status_code=400, detail="mode must be one of: llm, fast, hybrid.")
+
+
+async def run_ats_analysis(text: str, job_description: str, use_cache: bool, mode: str):
+    if not text or len(text.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Unable to extract sufficient text from resume"
+        )
+
+    if mode == "fast":
+        if len(job_description.strip()) < 50:
+            raise HTTPException(status_code=400, detail="Job description is required and must be at least 50 characters.")
+        return await run_in_threadpool(score_resume_locally, text, job_description)
+
+    if mode == "hybrid":
+        result = await analyze_resume_hybrid(text, job_description, use_cache=use_cache)
+    else:
+        result = await analyze_resume_with_groq(text, job_description, use_cache=use_cache)
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return result
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "pdf_text": pdf_text_cache.stats(),
+        "llm_results": llm_result_cache.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "auth": authenticator.stats(),
+        "adzuna_search": adzuna_search_cache.stats(),
+        "job_store": job_store.stats(),
+        "profile_artifacts": profile_artifacts.stats(),
+    }
+
+
+@registry.collector
+def service_metrics():
+    # Read from the services' own counters at scrape time; nothing extra on the hot path.
+    pdf, llm, gateway = pdf_text_cache.stats(), llm_result_cache.stats(), llm_gateway.stats()
+    auth, adzuna, store = authenticator.stats(), adzuna_search_cache.stats(), job_store.stats()
+    artifacts = profile_artifacts.stats()
+    cache_lookups = [
+        ("pdf_text", "hit", pdf["hits"]), ("pdf_text", "miss", pdf["misses"]),
+        ("llm_results", "hit", llm["hits"]), ("llm_results", "miss", llm["misses"]),
+        ("adzuna_search", "hit", adzuna["hits"]), ("adzuna_search", "stale", adzuna["stale_hits"]),
+        ("adzuna_search", "miss", adzuna["misses"]),
+        ("auth_token", "hit", auth["cache_hits"]),
+        ("auth_token", "miss", auth["local_verified"] + auth["remote_verified"] + auth["rejected"]),
+        ("profile_artifacts", "hit", artifacts["memory_hits"] + artifacts["disk_hits"]),
+        ("profile_artifacts", "miss", artifacts["misses"]),
+        ("job_store", "hit", store["served_locally"]), ("job_store", "miss", store["adzuna_fallbacks"]),
+    ]
+    return [
+        ("cache_lookups_total", "counter", "Cache lookups by cache and result.",
+         [({"cache": c, "result": r}, v) for c, r, v in cache_lookups]),
+        ("llm_upstream_calls_total", "counter", "Groq requests sent, retries included.", [({}, gateway["upstream_calls"])]),
+        ("llm_retries_total", "counter", "Groq requests retried after 429/5xx/connection errors.", [({}, gateway["retries"])]),
+        ("llm_coalesced_total", "counter", "Groq calls answered by an identical in-flight request.", [({}, gateway["coalesced"])]),
+        ("llm_in_flight", "gauge", "Distinct Groq calls currently in flight.", [({}, gateway["in_flight"])]),
+        ("tasks_queued", "gauge", "Background tasks waiting for a worker.", [({}, task_queue.queued())]),
+        ("job_store_live_postings", "gauge", "Unexpired postings in the local job store.", [({}, store["live_postings"])]),
+    ]
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.post("/profile/resume")
 async def upload_profile_resume(
     file: UploadFile = File(...),
@@ -62,17 +206,9 @@ async def upload_profile_resume(
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
     
     try:
-        content = await file.read()
-        
-        temp_path = UPLOAD_DIR / f"temp_{user_id}.pdf"
-        with open(temp_path, "wb") as f:
-            f.write(content)
+        upload = await ingest_upload(file)
         
-        try:
-            text = extract_text_from_pdf(str(temp_path))
-        finally:
-            if temp_path.exists():
-                temp_path.unlink()
+        text = await extract_pdf_text(upload)
         
         if not text or len(text.strip()) < 50:
             raise HTTPException(status_code=400, detail="Could not extract sufficient text from this PDF (scanned or empty).")
@@ -80,13 +216,13 @@ async def upload_profile_resume(
         storage_path = f"{user_id}/resume.pdf"
         
         try:
-            supabase.storage.from_("resumes").remove([storage_path])
+            await supabase.storage.from_("resumes").aremove([storage_path])
         except:
             pass
         
-        supabase.storage.from_("resumes").upload(
+        await supabase.storage.from_("resumes").aupload(
             path=storage_path,
-            file=content,
+            file=upload.content,
             file_options={"content-type": "application/pdf"}
         )
         
@@ -100,11 +236,16 @@ async def upload_profile_resume(
         }
         
         try:
-            supabase.table("profile_resumes").upsert(metadata, on_conflict="user_id").execute()
+            await supabase.table("profile_resumes").upsert(metadata, on_conflict="user_id").aexecute()
         except Exception as e:
             print(f"Upsert DB Error: {e}")
             raise HTTPException(status_code=500, detail=f"Database Upsert Error: {str(e)}")
         
+        await run_in_threadpool(upsert_candidate, metadata)
+        
+        profile_artifacts.invalidate(user_id, text)
+        await schedule_profile_artifacts(user_id, text)
+        
         return {
             "message": "Resume saved to profile",
             "filename": file.filename,
@@ -119,7 +260,7 @@ async def upload_profile_resume(
 @app.get("/profile/resume")
 async def get_profile_resume(user_id: str = Depends(get_current_user)):
     try:
-        response = supabase.table("profile_resumes").select("*").eq("user_id", user_id).execute()
+        response = await supabase.table("profile_resumes").select("*").eq("user_id", user_id).aexecute()
         
         if not response.data or len(response.data) == 0:
             return {"exists": False}
@@ -138,53 +279,56 @@ async def get_profile_resume(user_id: str = Depends(get_current_user)):
 async def analyze_ats(
     job_description: str = Form(...),
     file: UploadFile = File(None),
-    resume_source: str = Form("upload")
+    resume_source: str = Form("upload"),
+    use_cache: bool = Form(True),
+    stream: bool = Form(False),
+    mode: str = Form("llm")
 ):
-    text = ""
-    
-    if resume_source == "profile":
-        if not PROFILE_METADATA_PATH.exists():
-            raise HTTPException(status_code=400, detail="No resume found in profile. Please upload one first.")
-        
-        try:
-            with open(PROFILE_METADATA_PATH, "r") as f:
-                data = json.load(f)
-                text = data.get("text", "")
-        except:
-             raise HTTPException(status_code=500, detail="Profile resume data is corrupted.")
+    check_ats_mode(mode)
 
+    if resume_source == "profile":
+        text = read_profile_text()
     elif file:
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        if file.filename.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(str(file_path))
-        else:
-            try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
-            except:
-                pass
+        text = await upload_text(await ingest_upload(file))
     else:
         raise HTTPException(status_code=400, detail="You must either provide a file or select 'Use Profile Resume'.")
 
-    if not text or len(text.strip()) < 50:
-        raise HTTPException(
-            status_code=400,
-            detail="Unable to extract sufficient text from resume"
+    if stream and mode == "llm" and text and len(text.strip()) >= 50:
+        return StreamingResponse(
+            sse_stream(stream_resume_analysis(text, job_description, use_cache=use_cache)),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
         )
-    
-    result = analyze_resume_with_groq(text, job_description)
 
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
+    return await run_ats_analysis(text, job_description, use_cache, mode)
 
-    return result
+@app.post("/analyze_ats/bulk")
+async def analyze_ats_bulk(
+    job_description: str = Form(...),
+    files: List[UploadFile] = File(...),
+    mode: str = Form("llm"),
+    use_cache: bool = Form(True),
+    stream: bool = Form(True)
+):
+    check_ats_mode(mode)
+    if len(job_description.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Job description is required and must be at least 50 characters.")
 
-@app.post("/generate_resume")
-async def generate_resume_endpoint(
+    resumes, failures = await collect_resumes(files)
+    if not resumes and not failures:
+        raise HTTPException(status_code=400, detail="Upload a zip archive or one or more resume files.")
+
+    events = screen_resumes(resumes, failures, job_description, mode=mode, use_cache=use_cache)
+    if stream:
+        return StreamingResponse(sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    summary = None
+    async for event, data in events:
+        if event == "done":
+            summary = data
+    return summary
+
+async def generate_resume_form(
     full_name: str = Form(...),
     email: str = Form(...),
     phone: str = Form(None),
@@ -198,9 +342,7 @@ async def generate_resume_endpoint(
     certifications: str = Form(None),
     job_description: str = Form(...)
 ):
-    from .ats import generate_resume_with_groq
-    
-    data = {
+    return {
         "full_name": full_name,
         "email": email,
         "phone": phone,
@@ -215,7 +357,28 @@ async def generate_resume_endpoint(
         "job_description": job_description
     }
 
-    result = generate_resume_with_groq(data)
+
+@app.post("/generate_resume")
+async def generate_resume_endpoint(
+    data: dict = Depends(generate_resume_form),
+    stream: bool = Form(False)
+):
+    from .ats import stream_resume_generation
+
+    if stream:
+        return StreamingResponse(
+            sse_stream(stream_resume_generation(data)),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+
+    return await run_resume_generation(data)
+
+
+async def run_resume_generation(data: dict):
+    from .ats import generate_resume_with_groq
+
+    result = await generate_resume_with_groq(data)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -230,46 +393,276 @@ async def recommend_jobs(
     location: str = Form("India"),
     user_id: str = Depends(get_current_user)
 ):
+    upload = None
+    if not use_profile:
+        upload = await ingest_recommend_upload(file)
+    return await run_job_recommendation(user_id, use_profile, location, upload)
+
+
+async def ingest_recommend_upload(file: Optional[UploadFile]) -> IngestedUpload:
+    if not file:
+        raise HTTPException(status_code=400, detail="Please upload a resume or use profile resume.")
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
+    return await ingest_upload(file)
+
+
+async def load_profile_artifacts(user_id: str) -> dict:
+    # Precomputed at upload time; the DB row (and one Groq call) is only needed on a miss.
+    artifacts = profile_artifacts.get(user_id)
+    if artifacts is not None:
+        return artifacts
+
+    try:
+        response = await supabase.table("profile_resumes").select("*").eq("user_id", user_id).aexecute()
+        if not response.data or len(response.data) == 0:
+            raise HTTPException(status_code=404, detail="No profile resume found.")
+        row = response.data[0]
+    except Exception as e:
+        msg = str(e)
+        if "404" in msg: raise HTTPException(status_code=404, detail="No profile resume found.")
+        raise HTTPException(status_code=500, detail=f"Database Fetch Error: {msg}")
+
+    resume_text = row.get("text")
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+
+    stored = row.get("artifacts")
+    if is_current(stored, resume_text):
+        artifacts = dict(stored, text=resume_text)
+    else:
+        try:
+            artifacts = await compute_profile_artifacts(resume_text)
+        except Exception as e:
+            print(f"Profile artifacts unavailable for {user_id}: {e}")
+            return {"text": resume_text, "keywords": {"role": "", "skills": []}}
+    profile_artifacts.put(user_id, artifacts)
+    return artifacts
+
+
+async def run_job_recommendation(user_id: str, use_profile: bool, location: str, upload: Optional[IngestedUpload]):
     resume_text = ""
     
     if use_profile:
-        try:
-            response = supabase.table("profile_resumes").select("text").eq("user_id", user_id).execute()
-            if not response.data or len(response.data) == 0:
-                raise HTTPException(status_code=404, detail="No profile resume found.")
-            resume_text = response.data[0]["text"]
-        except Exception as e:
-            msg = str(e)
-            if "404" in msg: raise HTTPException(status_code=404, detail="No profile resume found.")
-            raise HTTPException(status_code=500, detail=f"Database Fetch Error: {msg}")
+        artifacts = await load_profile_artifacts(user_id)
+        resume_text = artifacts["text"]
+        role, skills = artifacts["keywords"]["role"], artifacts["keywords"]["skills"]
             
-    elif file:
-        if not file.filename.lower().endswith(".pdf"):
-            raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
-        
+    else:
         try:
-            temp_filename = f"temp_{user_id}_{file.filename}"
-            with open(temp_filename, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            resume_text = extract_text_from_pdf(temp_filename)
-            
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
-                
+            resume_text = await extract_pdf_text(upload)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"File Parse Error: {str(e)}")
-    else:
-        raise HTTPException(status_code=400, detail="Please upload a resume or use profile resume.")
         
-    if not resume_text:
-        raise HTTPException(status_code=400, detail="Could not extract text from resume.")
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Could not extract text from resume.")
         
-    role, skills = await get_search_keywords(resume_text)
+        role, skills = await get_search_keywords(resume_text)
     
-    jobs = await fetch_jobs(role, skills, location)
+    jobs, source = await find_jobs(role, skills, location, resume_text)
     
     return {
         "recommended_jobs": jobs,
-        "keywords": {"role": role, "skills": skills[:5]} 
+        "keywords": {"role": role, "skills": skills[:5]},
+        "source": source
     }
+
+
+@app.post("/jobs/match")
+async def match_jobs(
+    file: Optional[UploadFile] = File(None),
+    resume_text: str = Form(None),
+    top_k: int = Form(5)
+):
+    text = resume_text or ""
+    if file:
+        upload = await ingest_upload(file)
+        text = await extract_pdf_text(upload) if upload.is_pdf else upload.text()
+
+    if not text or len(text.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Provide a resume file or at least 50 characters of resume text.")
+
+    index = get_job_index()
+    matches = await run_in_threadpool(index.rank, text, max(1, min(top_k, 50)))
+    return {"matches": matches, "index": index.stats()}
+
+
+class BatchMatchRequest(BaseModel):
+    resumes: List[str]
+    top_k: int = 5
+
+
+@app.post("/jobs/match/batch")
+async def match_jobs_batch(body: BatchMatchRequest):
+    if not body.resumes:
+        raise HTTPException(status_code=400, detail="Provide at least one resume text.")
+    if len(body.resumes) > 5000:
+        raise HTTPException(status_code=413, detail="At most 5000 resumes per batch.")
+
+    index = get_job_index()
+    results = await run_in_threadpool(index.rank_batch, body.resumes, max(1, min(body.top_k, 50)))
+    return {"results": [{"resume_index": i, "matches": m} for i, m in enumerate(results)]}
+
+
+@app.post("/candidates/rank")
+async def rank_candidates(
+    job_description: str = Form(...),
+    top_k: int = Form(20),
+    user_id: str = Depends(get_recruiter)
+):
+    if len(job_description.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Job description must be at least 50 characters.")
+
+    matches = await run_in_threadpool(candidate_index.rank, job_description, max(1, min(top_k, 200)))
+    return {"candidates": matches, "index": candidate_index.stats()}
+
+
+# Background variants: same inputs as the endpoints above, but they answer at once with a
+# task id; poll /tasks/{task_id} and fetch /tasks/{task_id}/result when it has finished.
+
+async def analyze_ats_task(payload: dict, content: Optional[bytes]):
+    text = payload.get("text")
+    if content is not None:
+        text = await upload_text(IngestedUpload(payload["filename"], content, content_hash(content)))
+    return await run_ats_analysis(text, payload["job_description"], payload["use_cache"], payload["mode"])
+
+
+async def generate_resume_task(payload: dict, content: Optional[bytes]):
+    return await run_resume_generation(payload)
+
+
+async def recommend_jobs_task(payload: dict, content: Optional[bytes]):
+    upload = None
+    if content is not None:
+        upload = IngestedUpload(payload["filename"], content, content_hash(content))
+    return await run_job_recommendation(payload["user_id"], payload["use_profile"], payload["location"], upload)
+
+
+def as_task_handler(run):
+    async def handler(payload, content):
+        try:
+            return await run(payload, content)
+        except HTTPException as e:
+            raise TaskFailed(e.detail)
+    return handler
+
+
+task_queue.register("analyze_ats", as_task_handler(analyze_ats_task))
+task_queue.register("generate_resume", as_task_handler(generate_resume_task))
+task_queue.register("jobs_recommend", as_task_handler(recommend_jobs_task))
+
+
+async def profile_artifacts_task(payload: dict, content: Optional[bytes]):
+    user_id = payload["user_id"]
+    artifacts = await compute_profile_artifacts(content.decode("utf-8"))
+    if not profile_artifacts.put(user_id, artifacts):
+        return {"stored": False, "reason": "a newer resume was uploaded"}
+
+    if PROFILE_ARTIFACTS_REMOTE:
+        # Also kept on the profile row (without the text it already holds) for other instances.
+        try:
+            remote = {k: v for k, v in artifacts.items() if k != "text"}
+            await supabase.table("profile_resumes").upsert({"user_id": user_id, "artifacts": remote}, on_conflict="user_id").aexecute()
+        except Exception as e:
+            print(f"Could not store profile artifacts on the profile row: {e}")
+    return {"stored": True, "content_hash": artifacts["content_hash"], "keywords": artifacts["keywords"]}
+
+
+task_queue.register("profile_artifacts", profile_artifacts_task)
+
+
+async def schedule_profile_artifacts(user_id: str, text: str):
+    try:
+        # invalidate() has just dropped the artifacts, so a finished task for the same
+        # resume must not stand in for a new one
+        await task_queue.submit("profile_artifacts", user_id, {"user_id": user_id}, text.encode("utf-8"), dedupe_finished=False)
+    except TaskRejected as e:
+        print(f"Profile artifacts not scheduled for {user_id}: {e.detail}")
+
+
+async def submit_task(kind: str, owner: str, payload: dict, content: Optional[bytes] = None):
+    try:
+        task, deduplicated = await task_queue.submit(kind, owner, payload, content)
+    except TaskRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    task_id = task["task_id"]
+    return JSONResponse(status_code=202, content={
+        **task,
+        "deduplicated": deduplicated,
+        "status_url": f"/tasks/{task_id}",
+        "result_url": f"/tasks/{task_id}/result"
+    })
+
+
+@app.post("/tasks/analyze_ats")
+async def submit_analyze_ats(
+    job_description: str = Form(...),
+    file: UploadFile = File(None),
+    resume_source: str = Form("upload"),
+    use_cache: bool = Form(True),
+    mode: str = Form("llm"),
+    owner: str = Depends(task_owner)
+):
+    check_ats_mode(mode)
+    payload = {"job_description": job_description, "use_cache": use_cache, "mode": mode}
+    content = None
+
+    if resume_source == "profile":
+        payload["text"] = read_profile_text()
+    elif file:
+        upload = await ingest_upload(file)
+        payload["filename"] = upload.filename
+        content = upload.content
+    else:
+        raise HTTPException(status_code=400, detail="You must either provide a file or select 'Use Profile Resume'.")
+
+    return await submit_task("analyze_ats", owner, payload, content)
+
+
+@app.post("/tasks/generate_resume")
+async def submit_generate_resume(
+    data: dict = Depends(generate_resume_form),
+    owner: str = Depends(task_owner)
+):
+    return await submit_task("generate_resume", owner, data)
+
+
+@app.post("/tasks/jobs/recommend")
+async def submit_recommend_jobs(
+    file: Optional[UploadFile] = File(None),
+    use_profile: bool = Form(False),
+    location: str = Form("India"),
+    user_id: str = Depends(get_current_user)
+):
+    payload = {"user_id": user_id, "use_profile": use_profile, "location": location}
+    content = None
+    if not use_profile:
+        upload = await ingest_recommend_upload(file)
+        payload["filename"] = upload.filename
+        content = upload.content
+    return await submit_task("jobs_recommend", user_id, payload, content)
+
+
+@app.get("/tasks/stats")
+async def task_stats():
+    return await task_queue.stats()
+
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    task = await task_queue.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found or its result has expired.")
+    return task
+
+
+@app.get("/tasks/{task_id}/result")
+async def get_task_result(task_id: str):
+    task = await task_queue.get(task_id, with_result=True)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found or its result has expired.")
+    if task["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=task)
+    return task
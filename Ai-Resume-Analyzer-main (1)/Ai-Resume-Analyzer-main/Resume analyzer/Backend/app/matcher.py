@@ -1,34 +1,252 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
+import scipy.sparse as sp
+import numpy as np
+import joblib
+import hashlib
+import threading
+from abc import ABC, abstractmethod
 import json
 import os
 
 BASE_DIR = os.path.dirname(__file__)
 JOBS_PATH = os.path.join(BASE_DIR, "jobs.json")
+INDEX_DIR = os.getenv("INDEX_DIR", os.path.join(BASE_DIR, "index_storage"))
+JOB_INDEX_PATH = os.path.join(INDEX_DIR, "job_index.joblib")
+
+# Incremental adds reuse the fitted vocabulary/IDF; refit once they outweigh this fraction.
+REFIT_FRACTION = 0.5
+# Upper bound on the dense similarity block materialised per batch chunk.
+BATCH_BLOCK_BYTES = int(os.getenv("BATCH_BLOCK_BYTES", str(64 * 1024 * 1024)))
 
 def load_jobs():
     with open(JOBS_PATH, "r", encoding="utf-8") as f:
         jobs = json.load(f)
     return jobs
 
+def job_document(job):
+    return job["description"] + " " + " ".join(job.get("requirements", []))
+
+def job_id(job):
+    if job.get("id") is not None:
+        return str(job["id"])
+    key = f"{job.get('title', '')}|{job.get('company', '')}|{job.get('description', '')}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def top_k_indices(scores, k):
+    # Row-wise top-k of a dense (n, m) block: argpartition is O(m) per row,
+    # only the k survivors get sorted.
+    n_cols = scores.shape[1]
+    k = min(k, n_cols)
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.intp)
+    if k < n_cols:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(n_cols), (scores.shape[0], 1))
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+def corpus_signature(jobs):
+    payload = json.dumps(jobs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class TfidfIndex(ABC):
+    """TF-IDF index over a corpus of documents.
+
+    The vectorizer is fitted on the corpus only; ranking a query is one
+    ``transform`` plus a sparse product against the L2-normalised row matrix.
+    Subclasses say how an item becomes text, an id and a result dict.
+    """
+
+    def __init__(self, max_features=2000):
+        self.max_features = max_features
+        self.vectorizer = None
+        self.matrix = None
+        self.items = []
+        self.ids = []
+        self.fitted_size = 0
+        self.added_since_fit = 0
+        self.signature = None
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def document(self, item):
+        ...
+
+    @abstractmethod
+    def item_id(self, item):
+        ...
+
+    @abstractmethod
+    def format(self, item, score):
+        ...
+
+    def fit(self, items, signature=None):
+        with self._lock:
+            vectorizer = TfidfVectorizer(stop_words="english", max_features=self.max_features)
+            if items:
+                matrix = vectorizer.fit_transform([self.document(j) for j in items]).tocsr()
+            else:
+                matrix = None
+            self.vectorizer = vectorizer
+            self.matrix = matrix
+            self.items = list(items)
+            self.ids = [self.item_id(j) for j in items]
+            self.fitted_size = len(items)
+            self.added_since_fit = 0
+            self.signature = signature
+        return self
+
+    def add(self, items):
+        with self._lock:
+            existing = set(self.ids)
+            new_items = [j for j in items if self.item_id(j) not in existing]
+            if not new_items:
+                return 0
+            if self.matrix is None or self.added_since_fit + len(new_items) > REFIT_FRACTION * max(self.fitted_size, 1):
+                self.fit(self.items + new_items, self.signature)
+                return len(new_items)
+            rows = self.vectorizer.transform([self.document(j) for j in new_items])
+            self.matrix = sp.vstack([self.matrix, rows], format="csr")
+            self.items.extend(new_items)
+            self.ids.extend(self.item_id(j) for j in new_items)
+            self.added_since_fit += len(new_items)
+            return len(new_items)
+
+    def remove(self, ids):
+        with self._lock:
+            drop = set(str(i) for i in ids)
+            keep = [i for i, jid in enumerate(self.ids) if jid not in drop]
+            removed = len(self.ids) - len(keep)
+            if removed:
+                self.matrix = self.matrix[keep] if keep else None
+                self.items = [self.items[i] for i in keep]
+                self.ids = [self.ids[i] for i in keep]
+            return removed
+
+    def scores(self, query_text: str):
+        with self._lock:
+            if self.matrix is None:
+                return np.zeros(0)
+            query = self.vectorizer.transform([query_text])
+            return (query @ self.matrix.T).toarray().ravel()
+
+    def rank(self, query_text: str, top_k=5):
+        return self.rank_batch([query_text], top_k)[0]
+
+    def rank_batch(self, query_texts, top_k=5, chunk_size=None):
+        # Vectorise all queries in one pass, then score them chunk by chunk so the
+        # dense N x M similarity matrix never exists in full.
+        with self._lock:
+            if self.matrix is None or not query_texts:
+                return [[] for _ in query_texts]
+            queries = self.vectorizer.transform(query_texts).tocsr()
+            rows_t = self.matrix.T.tocsc()
+            n_rows = self.matrix.shape[0]
+            if chunk_size is None:
+                chunk_size = max(1, BATCH_BLOCK_BYTES // (8 * n_rows))
+
+            results = []
+            for start in range(0, queries.shape[0], chunk_size):
+                block = (queries[start:start + chunk_size] @ rows_t).toarray()
+                top = top_k_indices(block, top_k)
+                for row, idx in enumerate(top):
+                    results.append([self.format(self.items[i], block[row, i]) for i in idx])
+            return results
+
+    def save(self, path):
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            joblib.dump({
+                "max_features": self.max_features,
+                "vectorizer": self.vectorizer,
+                "matrix": self.matrix,
+                "items": self.items,
+                "ids": self.ids,
+                "fitted_size": self.fitted_size,
+                "added_since_fit": self.added_since_fit,
+                "signature": self.signature,
+            }, tmp_path)
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        index = cls(max_features=state["max_features"])
+        for key in ("vectorizer", "matrix", "items", "ids", "fitted_size", "added_since_fit", "signature"):
+            setattr(index, key, state[key])
+        return index
+
+    def upsert(self, item):
+        # Replace any row with the same id; new text is transformed against the
+        # current vocabulary like any other incremental add.
+        with self._lock:
+            self.remove([self.item_id(item)])
+            return self.add([item])
+
+    def stats(self):
+        return {
+            "size": len(self.ids),
+            "fitted_size": self.fitted_size,
+            "added_since_fit": self.added_since_fit,
+            "vocabulary": len(self.vectorizer.vocabulary_) if self.matrix is not None else 0,
+        }
+
+
+class JobIndex(TfidfIndex):
+    def document(self, job):
+        return job_document(job)
+
+    def item_id(self, job):
+        return job_id(job)
+
+    def format(self, job, score):
+        return format_result(job, score)
+
+
+def format_result(job, score):
+    return {
+        "title": job["title"],
+        "company": job.get("company"),
+        "location": job.get("location"),
+        "score": round(float(score), 4),
+        "description": job["description"],
+        "requirements": job.get("requirements", [])
+    }
+
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+def get_job_index(refresh=False):
+    # Loads the persisted index if it was built from the current jobs.json,
+    # otherwise fits a fresh one and writes it back to INDEX_DIR.
+    global _job_index
+    with _job_index_lock:
+        if _job_index is not None and not refresh:
+            return _job_index
+        jobs = load_jobs()
+        signature = corpus_signature(jobs)
+        index = None
+        if os.path.exists(JOB_INDEX_PATH):
+            try:
+                index = JobIndex.load(JOB_INDEX_PATH)
+            except Exception as e:
+                print(f"Job index load failed, rebuilding: {e}")
+        if index is None or index.signature != signature:
+            index = JobIndex().fit(jobs, signature)
+            try:
+                index.save(JOB_INDEX_PATH)
+            except Exception as e:
+                print(f"Job index save failed: {e}")
+        _job_index = index
+        return _job_index
+
 def rank_jobs(resume_text: str, top_k=5):
-    jobs = load_jobs()
-    corpus = [job["description"] + " " + " ".join(job.get("requirements", [])) for job in jobs]
-    docs = [resume_text] + corpus
-    vectorizer = TfidfVectorizer(stop_words="english", max_features=2000)
-    tfidf = vectorizer.fit_transform(docs)
-    cosine_similarities = linear_kernel(tfidf[0:1], tfidf[1:]).flatten()
-    ranked_idx = cosine_similarities.argsort()[::-1]
-    results = []
-    for idx in ranked_idx[:top_k]:
-        job = jobs[idx]
-        score = float(cosine_similarities[idx])
-        results.append({
-            "title": job["title"],
-            "company": job.get("company"),
-            "location": job.get("location"),
-            "score": round(score, 4),
-            "description": job["description"],
-            "requirements": job.get("requirements", [])
-        })
-    return results
+    return get_job_index().rank(resume_text, top_k)
+
+def rank_jobs_batch(resume_texts, top_k=5):
+    return get_job_index().rank_batch(resume_texts, top_k)
@@ -0,0 +1,157 @@
+import os
+import io
+import signal
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .resume_parser import extract_page_range, MIN_TEXT_CHARS, SCAN_PROBE_PAGES
+from .text_cache import pdf_text_cache, content_hash
+from .metrics import stage
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "20"))
+
+
+class PDFExtractionError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _WorkerTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _WorkerTimeout()
+
+
+def _extract_range_worker(content: bytes, start: int, end: int, budget: float):
+    # Runs inside a pool process. The alarm interrupts pdfplumber (pure Python)
+    # so a pathological page frees the worker instead of pinning it forever.
+    # It cannot interrupt pypdfium2, which is C code: a page stuck in there is
+    # handled parent-side by _retire_pool().
+    has_timer = hasattr(signal, "setitimer")
+    if has_timer and budget > 0:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        return extract_page_range(io.BytesIO(content), start, end)
+    except _WorkerTimeout:
+        return None
+    finally:
+        if has_timer and budget > 0:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+_pool = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn keeps workers free of the server's threads and open sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _kill_workers(processes):
+    for process in list(processes.values()):
+        if process.is_alive():
+            print(f"Terminating PDF worker {process.pid} stuck past its deadline")
+            process.terminate()
+
+
+def _retire_pool(pool):
+    # A task outlived its deadline while running, so its worker is stuck in C code
+    # and will never come back. Send new work to a fresh pool, let the old one finish
+    # what it was given, and kill its processes once every task it could still be
+    # legitimately running has passed its own deadline.
+    global _pool
+    if _pool is not pool:
+        return  # already retired by another request
+    _pool = None
+    processes = pool._processes or {}
+    pool.shutdown(wait=False)
+    asyncio.get_running_loop().call_later(PDF_EXTRACT_TIMEOUT + 1, _kill_workers, processes)
+
+
+async def _gather(pool, futures, timeout):
+    try:
+        return await asyncio.wait_for(asyncio.gather(*(asyncio.wrap_future(f) for f in futures)), timeout=timeout)
+    except asyncio.TimeoutError:
+        for f in futures:
+            f.cancel()  # only succeeds for tasks still queued
+        if any(f.running() for f in futures):
+            _retire_pool(pool)
+        raise
+
+
+async def _run_ranges(content: bytes, deadline: float):
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+
+    def remaining():
+        return max(0.1, deadline - loop.time())
+
+    # The first chunk also tells us how many pages there are to fan out over.
+    first = (await _gather(
+        pool, [pool.submit(_extract_range_worker, content, 0, PDF_PAGES_PER_TASK, remaining())], remaining()
+    ))[0]
+    if first is None:
+        raise asyncio.TimeoutError()
+    text, total = first
+    if total <= PDF_PAGES_PER_TASK:
+        return text
+    if len(text.strip()) < MIN_TEXT_CHARS and PDF_PAGES_PER_TASK >= SCAN_PROBE_PAGES:
+        # The probe pages had no text layer: scanned document, don't fan out.
+        return text
+
+    pool = get_pool()  # another request may have retired it meanwhile
+    futures = [
+        pool.submit(_extract_range_worker, content, start, start + PDF_PAGES_PER_TASK, remaining())
+        for start in range(PDF_PAGES_PER_TASK, total, PDF_PAGES_PER_TASK)
+    ]
+    rest = await _gather(pool, futures, remaining())
+    if any(r is None for r in rest):
+        raise asyncio.TimeoutError()
+    return text + "".join(r[0] for r in rest)
+
+
+async def extract_text_async(content: bytes, key: str = None) -> str:
+    key = key or content_hash(content)
+    text = pdf_text_cache.get(key)
+    if text is not None:
+        return text
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PDF_EXTRACT_TIMEOUT
+    try:
+        with stage("pdf_parse"):
+            text = await _run_ranges(content, deadline)
+    except asyncio.TimeoutError:
+        raise PDFExtractionError(422, f"PDF took longer than {PDF_EXTRACT_TIMEOUT:g}s to process and was cancelled.")
+    except BrokenProcessPool:
+        shutdown_pool()
+        raise PDFExtractionError(422, "PDF could not be processed.")
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+        return ""
+
+    if text:
+        pdf_text_cache.put(key, text)
+    return text
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .llm_cache import CACHE_DIR, normalize_text
+from .adzuna_service import get_search_keywords
+
+# Bump when anything computed below changes so stored artifacts are rebuilt.
+ARTIFACTS_VERSION = "profile-v2"
+PROFILE_ARTIFACTS_PATH = os.getenv("PROFILE_ARTIFACTS_PATH", os.path.join(CACHE_DIR, "profile_artifacts.sqlite3"))
+PROFILE_ARTIFACTS_CACHE_SIZE = int(os.getenv("PROFILE_ARTIFACTS_CACHE_SIZE", "1000"))
+# Also copy artifacts to profile_resumes.artifacts (a jsonb column that must be added to
+# the table first) so other app instances can skip the Groq call.
+PROFILE_ARTIFACTS_REMOTE = os.getenv("PROFILE_ARTIFACTS_REMOTE", "0") == "1"
+
+
+def artifacts_hash(text: str) -> str:
+    return hashlib.sha256(f"{ARTIFACTS_VERSION}\x1f{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def is_current(artifacts, text: str = None) -> bool:
+    if not isinstance(artifacts, dict) or artifacts.get("version") != ARTIFACTS_VERSION:
+        return False
+    return text is None or artifacts.get("content_hash") == artifacts_hash(text)
+
+
+async def compute_profile_artifacts(text: str) -> dict:
+    # Only what /jobs/recommend reads back: the text and the Groq search keywords.
+    role, skills = await get_search_keywords(text)
+    if not role and not skills:
+        # get_search_keywords swallows Groq failures; don't pin an empty result
+        raise RuntimeError("Keyword extraction returned nothing")
+    return {
+        "version": ARTIFACTS_VERSION,
+        "content_hash": artifacts_hash(text),
+        "computed_at": time.time(),
+        "text": text,
+        "keywords": {"role": role, "skills": skills},
+    }
+
+
+class ProfileArtifactStore:
+    """Per-user derived resume data: an in-process LRU in front of a local SQLite table."""
+
+    def __init__(self, path, max_entries=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._latest = {}  # user_id -> content_hash of the most recent upload
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.computed = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profile_artifacts ("
+                " user_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL,"
+                " artifacts TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, user_id, artifacts):
+        with self._lock:
+            self._memory[user_id] = artifacts
+            self._memory.move_to_end(user_id)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            artifacts = self._memory.get(user_id)
+            if artifacts is not None:
+                self._memory.move_to_end(user_id)
+        if artifacts is not None:
+            self.memory_hits += 1
+            return artifacts
+
+        row = self._conn().execute(
+            "SELECT artifacts FROM profile_artifacts WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        artifacts = json.loads(row[0]) if row else None
+        if not is_current(artifacts):
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(user_id, artifacts)
+        return artifacts
+
+    def put(self, user_id: str, artifacts: dict) -> bool:
+        # Ignores artifacts for a resume that has since been replaced by a newer upload.
+        latest = self._latest.get(user_id)
+        if latest is not None and latest != artifacts["content_hash"]:
+            return False
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profile_artifacts (user_id, content_hash, artifacts, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (user_id, artifacts["content_hash"], json.dumps(artifacts), time.time()),
+            )
+        self._remember(user_id, artifacts)
+        self.computed += 1
+        return True
+
+    def invalidate(self, user_id: str, new_text: str = None):
+        # Called on upload, before the new artifacts exist, so the old ones are never served.
+        with self._lock:
+            self._memory.pop(user_id, None)
+        if new_text is not None:
+            self._latest[user_id] = artifacts_hash(new_text)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM profile_artifacts WHERE user_id = ?", (user_id,))
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "version": ARTIFACTS_VERSION,
+            "in_memory": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "computed": self.computed,
+        }
+
+
+profile_artifacts = ProfileArtifactStore(PROFILE_ARTIFACTS_PATH, PROFILE_ARTIFACTS_CACHE_SIZE)
@@ -0,0 +1,181 @@
+import os
+import re
+from functools import lru_cache
+
+RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKEN_BUDGET", "1800"))
+JD_TOKEN_BUDGET = int(os.getenv("PROMPT_JD_TOKEN_BUDGET", "900"))
+KEYWORDS_TOKEN_BUDGET = int(os.getenv("PROMPT_KEYWORDS_TOKEN_BUDGET", "750"))
+
+# Rough but dependency-free: Llama-family tokenizers average ~4 characters per token on English prose.
+CHARS_PER_TOKEN = 4
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Candidate digit runs; _is_phone() then insists on a real phone shape.
+_PHONE = re.compile(r"\+?\(?\d[\d\-\s().]{8,}\d")
+_YEAR = re.compile(r"(19|20)\d{2}")
+_DATE = re.compile(r"\d{1,2}[./]\d{1,2}[./]\d{2,4}")
+_CONTACT_LABEL = re.compile(r"\b(e-?mail|phone|mobile|cell|tel|contact|linkedin|github|portfolio|website)\b", re.IGNORECASE)
+_URL = re.compile(r"(https?://|www\.|linkedin\.com|github\.com)\S*", re.IGNORECASE)
+_EEO = re.compile(
+    r"equal (employment )?opportunity|without regard to|protected veteran|reasonable accommodation"
+    r"|sexual orientation|gender identity|national origin|e-verify|affirmative action|\beeo\b",
+    re.IGNORECASE,
+)
+
+# Resume sections in the order they should survive a tight budget.
+SECTION_PRIORITY = [
+    ("skills", r"(technical\s+)?skills|core competencies|technologies|tech stack"),
+    ("experience", r"(work\s+|professional\s+)?experience|employment( history)?|work history"),
+    ("projects", r"projects?"),
+    ("summary", r"(professional\s+)?summary|profile|about me|objective"),
+    ("education", r"education|academics?|qualifications?"),
+    ("certifications", r"certifications?|licen[cs]es|courses|achievements|awards"),
+]
+_HEADING = re.compile(
+    r"^\s*(" + "|".join(p for _, p in SECTION_PRIORITY) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def collapse_whitespace(text: str) -> str:
+    lines = [" ".join(line.split()) for line in (text or "").splitlines()]
+    out = []
+    for line in lines:
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+def strip_page_numbers(lines):
+    return [l for l in lines if not _PAGE_NUMBER.match(l)]
+
+
+def dedupe_lines(lines):
+    # Also drops running headers/footers: every repeat after a line's first appearance goes.
+    seen = set()
+    out = []
+    for line in lines:
+        key = line.lower()
+        if line and key in seen:
+            continue
+        seen.add(key)
+        out.append(line)
+    return out
+
+
+def _is_phone(match) -> bool:
+    text = match.group(0)
+    groups = re.findall(r"\d+", text)
+    # Employment/education dates ("01.2019 - 03.2023", "(06 2018 - 09 2020)") are not
+    # phone numbers: any 19xx/20xx group, or a dd.mm.yy style date, rules a match out.
+    if any(_YEAR.fullmatch(g) for g in groups) or _DATE.search(text):
+        return False
+    digits = sum(len(g) for g in groups)
+    if text.startswith("+"):
+        return 8 <= digits <= 15
+    return 10 <= digits <= 15
+
+
+def _strip_contacts(line, found):
+    for label, pattern in (("email", _EMAIL), ("phone", _PHONE), ("links", _URL)):
+        def drop(match, label=label):
+            if label == "phone" and not _is_phone(match):
+                return match.group(0)
+            if label not in found:
+                found.append(label)
+            return " "
+        line = pattern.sub(drop, line)
+    return line
+
+
+def summarize_contact_lines(lines):
+    # Contact details carry no signal for matching; keep a marker so the model still
+    # knows they exist when judging ATS parseability. Only the contact tokens go: a line
+    # is dropped when nothing but tokens, labels and separators was on it.
+    found = []
+    out = []
+    for line in lines:
+        stripped = _strip_contacts(line, found)
+        if stripped == line:
+            out.append(line)
+            continue
+        rest = " ".join(stripped.split()).strip(" |,;/-•·")
+        if re.sub(r"[\W_]+", "", _CONTACT_LABEL.sub("", rest)):
+            out.append(rest)
+    if found:
+        out.insert(1 if out else 0, f"[contact details present: {', '.join(found)}]")
+    return out
+
+
+def split_sections(lines):
+    # [(section_name, [lines])]; text before the first heading is the "header" section.
+    sections = [("header", [])]
+    for line in lines:
+        match = _HEADING.match(line)
+        if match:
+            heading = match.group(1).lower()
+            name = next((n for n, p in SECTION_PRIORITY if re.fullmatch(p, heading, re.IGNORECASE)), heading)
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(n, l) for n, l in sections if any(l)]
+
+
+def pack_sections(sections, token_budget: int) -> str:
+    # Keep the header, then fill the budget by section priority; output keeps document order.
+    rank = {name: i for i, (name, _) in enumerate(SECTION_PRIORITY)}
+    order = sorted(range(len(sections)), key=lambda i: (-1 if sections[i][0] == "header" else rank.get(sections[i][0], len(rank)), i))
+    budget = token_budget * CHARS_PER_TOKEN
+    kept = {}
+    for i in order:
+        if budget <= 0:
+            break
+        name, lines = sections[i]
+        taken = []
+        spent = 0
+        for line in lines:
+            cost = len(line) + 1
+            if spent + cost > budget:
+                break
+            taken.append(line)
+            spent += cost
+        if name != "header" and len(taken) == 1 and len(lines) > 1:
+            continue  # a bare heading is noise; leave the budget for other sections
+        if taken:
+            kept[i] = taken
+            budget -= spent
+    return "\n".join(line for i in sorted(kept) for line in kept[i])
+
+
+def _log(label, before, after):
+    print(f"Prompt compaction [{label}]: ~{estimate_tokens(before)} -> ~{estimate_tokens(after)} tokens")
+
+
+def compact_resume(text: str, token_budget: int = None, label: str = "resume") -> str:
+    token_budget = token_budget or RESUME_TOKEN_BUDGET
+    lines = collapse_whitespace(text).splitlines()
+    lines = dedupe_lines(strip_page_numbers(lines))
+    lines = summarize_contact_lines(lines)
+    compacted = pack_sections(split_sections(lines), token_budget)
+    _log(label, text or "", compacted)
+    return compacted
+
+
+# The same JD is sent with every resume in a bulk screen; compact it once.
+@lru_cache(maxsize=64)
+def compact_job_description(text: str, token_budget: int = None, label: str = "job_description") -> str:
+    token_budget = token_budget or JD_TOKEN_BUDGET
+    lines = collapse_whitespace(text).splitlines()
+    lines = dedupe_lines(strip_page_numbers(lines))
+    lines = [l for l in lines if not _EEO.search(l)]
+    compacted = "\n".join(lines)
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(compacted) > limit:
+        compacted = compacted[:limit].rsplit("\n", 1)[0] if "\n" in compacted[:limit] else compacted[:limit]
+    _log(label, text or "", compacted)
+    return compacted
@@ -0,0 +1,105 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+
+class StaleWhileRevalidateCache:
+    """In-memory LRU cache for async fetches.
+
+    - younger than ``ttl``: served as is;
+    - older, but within ``stale_ttl`` more: served at once while one background
+      refresh replaces it;
+    - missing or older than that: fetched inline; concurrent misses for the same key
+      share one fetch.
+    Failed fetches are never cached; a failed refresh leaves the stale entry in place.
+    """
+
+    def __init__(self, ttl=900, stale_ttl=3600, max_entries=2000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._inflight = {}
+        self._refreshing = {}  # key -> background refresh task (held so it isn't collected)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+    def _store(self, key, value):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load(self, key, fetch):
+        value = await fetch()
+        self._store(key, value)
+        return value
+
+    async def _fetch(self, key, fetch):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shielded: a caller giving up (e.g. a fan-out deadline) still lets the
+        # fetch finish and warm the cache for the next request
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key, fetch):
+        try:
+            await self._fetch(key, fetch)
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Background refresh of {key} failed, keeping stale entry: {e!r}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_fetch(self, key, fetch):
+        # fetch: zero-argument coroutine function producing the value for key
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.ensure_future(self._refresh(key, fetch))
+                return entry[1]
+            del self._entries[key]
+
+        self.misses += 1
+        return await self._fetch(key, fetch)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._refreshing),
+            "evictions": self.evictions,
+        }
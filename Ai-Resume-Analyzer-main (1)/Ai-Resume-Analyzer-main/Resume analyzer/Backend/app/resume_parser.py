@@ -1,17 +1,74 @@
+import os
 import pdfplumber
+import pypdfium2 as pdfium
 import re
 from typing import Optional
 
+from .skill_engine import default_matcher, matcher_for
+from .metrics import timed
+
 nlp = None
 
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
+PDF_FAST_MODE = os.getenv("PDF_FAST_MODE", "1") == "1"
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+SCAN_PROBE_PAGES = 2
+MIN_TEXT_CHARS = 50
+
+def _iter_pages_fast(file_path, start, end):
+    # pdfium's text layer: no pdfminer layout analysis, a fraction of the time/memory
+    doc = pdfium.PdfDocument(file_path)
+    try:
+        total = min(len(doc), PDF_MAX_PAGES)
+        yield total
+        for i in range(start, min(end, total)):
+            page = doc[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_bounded().replace("\r\n", "\n").rstrip("\n")
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        doc.close()
+
+def _iter_pages_layout(file_path, start, end):
+    with pdfplumber.open(file_path) as pdf:
+        total = min(len(pdf.pages), PDF_MAX_PAGES)
+        yield total
+        for i in range(start, min(end, total)):
+            page = pdf.pages[i]
+            try:
+                yield page.extract_text() or ""
+            finally:
+                page.close()  # drop the page's object/layout caches as we go
+
+def iter_pdf_pages(file_path, start: int = 0, end: Optional[int] = None, fast: Optional[bool] = None):
+    # First yields the (capped) page count, then one text string per page in [start, end).
+    # Stops early if the first SCAN_PROBE_PAGES pages carry no real text layer.
+    if fast is None:
+        fast = PDF_FAST_MODE
+    pages = (_iter_pages_fast if fast else _iter_pages_layout)(file_path, start, PDF_MAX_PAGES if end is None else end)
+    total = next(pages)
+    yield total
+    probed_chars = 0
+    for offset, page_text in enumerate(pages):
+        yield page_text
+        if start == 0 and offset < SCAN_PROBE_PAGES:
+            probed_chars += len(page_text.strip())
+            if offset == SCAN_PROBE_PAGES - 1 and probed_chars < MIN_TEXT_CHARS:
+                print("PDF looks scanned or empty; skipping remaining pages.")
+                return
+
+def extract_page_range(file_path, start: int, end: int, fast: Optional[bool] = None):
+    # Returns (text, total_page_count) for pages[start:end]
+    pages = iter_pdf_pages(file_path, start, end, fast)
+    total = next(pages)
+    return "".join("\n" + t for t in pages if t), total
+
+def extract_text_from_pdf(file_path, fast: Optional[bool] = None) -> str:
+    # file_path may be a filesystem path or a binary file-like object
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += "\n" + page_text
+        text, _ = extract_page_range(file_path, 0, PDF_MAX_PAGES, fast)
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return ""
@@ -39,15 +96,14 @@ def extract_phone_numbers(text: str):
     phones = [re.sub(r'\s+', '', p) for p in phones]
     return phones
 
-def extract_skills(text: str, skills_list):
-    text_lower = text.lower()
-    found = set()
-    for skill in skills_list:
-        if skill.lower() in text_lower:
-            found.add(skill)
-    return sorted(found)
+@timed("skill_extract")
+def extract_skills(text: str, skills_list=None):
+    # skills_list=None uses the skills.txt taxonomy (with its aliases)
+    matcher = default_matcher() if skills_list is None else matcher_for(tuple(skills_list))
+    return matcher.extract(text)
 
-def parse_resume_text(text: str, skills_list):
+@timed("resume_parse")
+def parse_resume_text(text: str, skills_list=None):
     text = clean_text(text)
     name = extract_name(text)
     emails = extract_emails(text)
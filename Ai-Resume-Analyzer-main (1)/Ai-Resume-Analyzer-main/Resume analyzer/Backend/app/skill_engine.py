@@ -0,0 +1,162 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+from scipy import sparse
+
+BASE_DIR = os.path.dirname(__file__)
+SKILLS_PATH = os.path.join(BASE_DIR, "skills.txt")
+
+# A match may not touch a letter/digit on either side, and may not be followed by
+# "+" or "#" ("Java" must not hit "JavaScript", "git" not "digital", "C" not "C++").
+_LEFT_BOUNDARY = r"(?<![A-Za-z0-9_])"
+_RIGHT_BOUNDARY = r"(?![A-Za-z0-9_+#])"
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    start: int
+    end: int
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def load_skill_taxonomy(path: str = SKILLS_PATH) -> Dict[str, List[str]]:
+    # One skill per line, optionally followed by ": alias, alias, ..."
+    taxonomy = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, aliases = line.partition(":")
+            taxonomy[name.strip()] = [a.strip() for a in aliases.split(",") if a.strip()]
+    return taxonomy
+
+
+def _trie_pattern(node) -> str:
+    # Turn a character trie into a regex in which shared prefixes are factored out,
+    # so the engine walks each position of the text through the trie once rather
+    # than retrying every alternative.
+    if "" in node and len(node) == 1:
+        return ""
+    alternatives = []
+    for char in sorted(k for k in node if k):
+        if char == " ":
+            head = r"\s+"
+        else:
+            head = re.escape(char)
+        alternatives.append(head + _trie_pattern(node[char]))
+    optional = "" in node
+    if len(alternatives) == 1 and not optional:
+        return alternatives[0]
+    body = "(?:" + "|".join(alternatives) + ")"
+    return body + "?" if optional else body
+
+
+class SkillMatcher:
+    """Single-pass, case-insensitive, word-bounded matcher for a skill taxonomy."""
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.canonical = {}
+        for name, aliases in taxonomy.items():
+            for term in [name] + list(aliases):
+                key = normalize_term(term)
+                if key:
+                    self.canonical.setdefault(key, name)
+
+        trie = {}
+        for term in self.canonical:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        if trie:
+            # Greedy trie alternation prefers the longest surface form at each position
+            # because longer branches are tried before the optional end-of-term.
+            # re.ASCII: Unicode case folding would let "gıt" or "reſt" match terms whose
+            # lower() is not a key of self.canonical.
+            self.pattern = re.compile(
+                _LEFT_BOUNDARY + "(?:" + _trie_pattern(trie) + ")" + _RIGHT_BOUNDARY, re.IGNORECASE | re.ASCII
+            )
+        else:
+            self.pattern = None
+
+    @classmethod
+    def from_list(cls, skills):
+        return cls({s: [] for s in skills if s and s.strip()})
+
+    def finditer(self, text: str) -> List[SkillMatch]:
+        if not self.pattern or not text:
+            return []
+        matches = []
+        for m in self.pattern.finditer(text):
+            skill = self.canonical.get(normalize_term(m.group(0)))
+            if skill is not None:
+                matches.append(SkillMatch(skill, m.start(), m.end()))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        return sorted({m.skill for m in self.finditer(text)})
+
+    def canonical_name(self, term: str):
+        return self.canonical.get(normalize_term(term))
+
+    def occurrence_matrix(self, texts: List[str]):
+        # (docs x skills CSR 0/1 matrix, skill names) from a single regex pass over all
+        # texts joined together; match offsets are mapped back to documents in numpy.
+        names = sorted(set(self.canonical.values()))
+        if not self.pattern or not texts:
+            return sparse.csr_matrix((len(texts), len(names)), dtype=np.float32), names
+        column = {name: i for i, name in enumerate(names)}
+        separator = "\n\x00\n"
+        lengths = np.fromiter((len(t) + len(separator) for t in texts), dtype=np.int64, count=len(texts))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        surface = {}  # matched text -> column, so each spelling is normalised once
+        offsets, cols = [], []
+        for m in self.pattern.finditer(separator.join(texts)):
+            found = m.group(0)
+            if found not in surface:
+                skill = self.canonical.get(normalize_term(found))
+                surface[found] = column[skill] if skill is not None else None
+            col = surface[found]
+            if col is None:
+                continue
+            offsets.append(m.start())
+            cols.append(col)
+        if not offsets:
+            return sparse.csr_matrix((len(texts), len(names)), dtype=np.float32), names
+        rows = np.searchsorted(starts, np.asarray(offsets, dtype=np.int64), side="right") - 1
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(texts), len(names)))
+        matrix.data[:] = 1.0  # duplicates were summed; presence is what counts
+        return matrix, names
+
+
+@lru_cache(maxsize=256)
+def matcher_for(skills: tuple) -> SkillMatcher:
+    return SkillMatcher.from_list(skills)
+
+
+@lru_cache(maxsize=1)
+def default_taxonomy() -> Dict[str, List[str]]:
+    return load_skill_taxonomy()
+
+
+@lru_cache(maxsize=1)
+def default_matcher() -> SkillMatcher:
+    return SkillMatcher(default_taxonomy())
+
+
+@lru_cache(maxsize=256)
+def taxonomy_matcher_with(extra_skills: tuple) -> SkillMatcher:
+    # The taxonomy (with its aliases) plus skills it doesn't know, e.g. ones an LLM named.
+    taxonomy = dict(default_taxonomy())
+    for skill in extra_skills:
+        if skill and skill.strip():
+            taxonomy.setdefault(skill.strip(), [])
+    return SkillMatcher(taxonomy)
@@ -0,0 +1,153 @@
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONObjectParser:
+    """Parses a streamed JSON object and reports each top-level field as soon as it closes.
+
+    ``feed`` returns a list of events:
+      ("field", key, value)  - a top-level member is complete;
+      ("delta", key, text)   - more decoded text of a top-level string listed in
+                               ``stream_fields`` (emitted before its "field" event).
+    Anything before the opening brace (e.g. a ```json fence) is skipped. Decoding is
+    lenient about raw control characters in strings, which models emit outside JSON mode.
+    """
+
+    def __init__(self, stream_fields=()):
+        self.stream_fields = set(stream_fields)
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.unicode_left = 0
+        self.key = None
+        self.expect = "key"  # key -> colon -> value -> comma
+        self.string_start = None
+        self.value_start = None
+        self.delta_from = None
+        self.result = {}
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        i = self.pos
+        while i < len(buf) and not self.finished:
+            ch = buf[i]
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+                i += 1
+                continue
+
+            if self.in_string:
+                if self.unicode_left:
+                    self.unicode_left -= 1
+                elif self.escape:
+                    self.escape = False
+                    if ch == "u":
+                        self.unicode_left = 4
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._close_string(buf, i, events)
+                i += 1
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.string_start = i
+                    if self.expect == "value":
+                        self.value_start = i
+                        if self.key in self.stream_fields:
+                            self.delta_from = i + 1
+            elif ch in "{[":
+                if self.depth == 1 and self.expect == "value":
+                    self.value_start = i
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.value_start is not None:
+                    self._emit_value(buf[self.value_start:i + 1], events)
+                elif self.depth == 0:
+                    self._flush_scalar(buf, i, events)
+                    self.finished = True
+            elif self.depth == 1:
+                if ch == ":" and self.expect == "colon":
+                    self.expect = "value"
+                elif ch == ",":
+                    self._flush_scalar(buf, i, events)
+                    self.expect = "key"
+                elif self.expect == "value" and self.value_start is None and ch not in _WHITESPACE:
+                    self.value_start = i  # number / true / false / null
+            i += 1
+        self.pos = i
+
+        if self.in_string and self.delta_from is not None:
+            self._emit_delta(buf, i, events, partial=True)
+        return events
+
+    def _close_string(self, buf, i, events):
+        if self.expect == "key":
+            self.key = json.loads(buf[self.string_start:i + 1], strict=False)
+            self.expect = "colon"
+        elif self.expect == "value":
+            if self.delta_from is not None:
+                self._emit_delta(buf, i, events, partial=False)
+                self.delta_from = None
+            self._emit_value(buf[self.value_start:i + 1], events)
+
+    def _flush_scalar(self, buf, end, events):
+        if self.expect == "value" and self.value_start is not None:
+            self._emit_value(buf[self.value_start:end].strip(), events)
+
+    def _emit_value(self, raw, events):
+        try:
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            value = None
+        if value is not None or raw == "null":
+            self.result[self.key] = value
+            events.append(("field", self.key, value))
+        self.value_start = None
+        self.expect = "comma"
+
+    def _emit_delta(self, buf, end, events, partial):
+        # Never cut through an escape sequence; the rest goes out with the next chunk.
+        stop = end
+        if partial:
+            if self.escape:
+                stop = end - 1
+            elif self.unicode_left:
+                stop = end - (6 - self.unicode_left)
+        if stop <= self.delta_from:
+            return
+        text = json.loads('"' + buf[self.delta_from:stop] + '"', strict=False)
+        if partial and text and "\ud800" <= text[-1] <= "\udbff":
+            # high half of an escaped surrogate pair; wait for the low half
+            stop -= 6
+            text = text[:-1]
+        self.delta_from = stop
+        if text:
+            events.append(("delta", self.key, text))
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_stream(events):
+    # events: async iterator of (event, data) pairs
+    async for event, data in events:
+        yield sse_event(event, data)
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
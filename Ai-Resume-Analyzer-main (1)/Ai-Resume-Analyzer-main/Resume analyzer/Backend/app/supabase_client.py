@@ -1,7 +1,10 @@
 import os
-import requests
+import importlib.util
+import httpx
 from dotenv import load_dotenv
 
+from .metrics import stage
+
 # Load environment variables
 load_dotenv()
 
@@ -13,6 +16,14 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables")
 
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "15"))
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]").
+SUPABASE_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
 class SupabaseClient:
     def __init__(self, url, key):
         self.url = url
@@ -22,6 +33,45 @@ class SupabaseClient:
             "Authorization": f"Bearer {key}",
             "Content-Type": "application/json"
         }
+        self._sync_client = None
+        self._async_client = None
+
+    def _client_options(self):
+        return dict(
+            http2=SUPABASE_HTTP2,
+            timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    @property
+    def http(self) -> httpx.Client:
+        # Blocking calls (startup index build, scripts); created on first use.
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(**self._client_options())
+        return self._sync_client
+
+    @property
+    def ahttp(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    def open(self):
+        # Called from the app lifespan so the async pool belongs to the server's loop.
+        self.ahttp
+        print(f"Supabase transport ready (http2={SUPABASE_HTTP2}, max_connections={SUPABASE_MAX_CONNECTIONS})")
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
     
     def table(self, table_name):
         return SupabaseQueryBuilder(self, table_name)
@@ -41,41 +91,51 @@ class SupabaseAuth:
     def __init__(self, client):
         self.client = client
         
-    def get_user(self, jwt):
-        return UserResponse(self.client, jwt)
-
-class UserObject:
-    def __init__(self, id, email):
-        self.id = id
-        self.email = email
-
-class UserResponse:
-    def __init__(self, client, jwt):
-        # Validate JWT via auth/v1/user endpoint
-        url = f"{client.url}/auth/v1/user"
-        
+    def _request(self, jwt):
         # USE ANON KEY FOR AUTH VALIDATION if available, otherwise fallback to key
-        api_key = SUPABASE_ANON_KEY if SUPABASE_ANON_KEY else client.key
-        
+        api_key = SUPABASE_ANON_KEY if SUPABASE_ANON_KEY else self.client.key
         headers = {
             "apikey": api_key,
             "Authorization": f"Bearer {jwt}",
             "Content-Type": "application/json"
         }
-        
+        return f"{self.client.url}/auth/v1/user", headers
+
+    def get_user(self, jwt):
+        url, headers = self._request(jwt)
+        try:
+            return UserResponse(self.client.http.get(url, headers=headers))
+        except Exception as e:
+            print(f"Auth Exception: {e}")
+            return UserResponse(None)
+
+    async def aget_user(self, jwt):
+        url, headers = self._request(jwt)
         try:
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                self.user = UserObject(data["id"], data.get("email"))
-            else:
-                print(f"Auth Failed: Status {response.status_code}")
-                print(f"Auth Response: {response.text}")
-                print(f"Auth Headers Sent (first 10 chars of token): {headers.get('Authorization', '')[:17]}...")
-                self.user = None
+            with stage("supabase_auth"):
+                response = await self.client.ahttp.get(url, headers=headers)
+            return UserResponse(response)
         except Exception as e:
             print(f"Auth Exception: {e}")
-            self.user = None
+            return UserResponse(None)
+
+class UserObject:
+    def __init__(self, id, email, app_metadata=None):
+        self.id = id
+        self.email = email
+        self.app_metadata = app_metadata or {}
+
+class UserResponse:
+    def __init__(self, response):
+        self.user = None
+        if response is None:
+            return
+        if response.status_code == 200:
+            data = response.json()
+            self.user = UserObject(data["id"], data.get("email"), data.get("app_metadata"))
+        else:
+            print(f"Auth Failed: Status {response.status_code}")
+            print(f"Auth Response: {response.text}")
 
 class SupabaseQueryBuilder:
     def __init__(self, client, table):
@@ -90,6 +150,18 @@ class SupabaseQueryBuilder:
     def eq(self, column, value):
         self.params[f"{column}"] = f"eq.{value}"
         return self
+
+    def order(self, column, desc=False):
+        self.params["order"] = f"{column}.{'desc' if desc else 'asc'}"
+        return self
+
+    def limit(self, count):
+        self.params["limit"] = str(count)
+        return self
+
+    def offset(self, count):
+        self.params["offset"] = str(count)
+        return self
         
     def upsert(self, data, on_conflict=None):
         self.data = data
@@ -100,21 +172,7 @@ class SupabaseQueryBuilder:
             self.params["on_conflict"] = on_conflict
         return self
         
-    def execute(self):
-        url = f"{self.client.url}/rest/v1/{self.table}"
-        
-        # Build query string
-        query_params = {k: v for k, v in self.params.items()}
-        
-        if response.status_code >= 400:
-            raise Exception(f"Supabase Error: {response.text}")
-            
-        try:
-            return Response(response.json())
-        except:
-            return Response({})
-            
-    def execute(self):
+    def _request(self):
         url = f"{self.client.url}/rest/v1/{self.table}"
         
         # Build query string
@@ -122,11 +180,12 @@ class SupabaseQueryBuilder:
         
         if hasattr(self, 'data'):
             # It's an UPSERT (POST)
-            response = requests.post(url, headers=self.headers, json=self.data, params=query_params)
-        else:
-            # It's a SELECT (GET)
-            response = requests.get(url, headers=self.client.headers, params=query_params)
-            
+            return dict(method="POST", url=url, headers=self.headers, json=self.data, params=query_params)
+        # It's a SELECT (GET)
+        return dict(method="GET", url=url, headers=self.client.headers, params=query_params)
+
+    @staticmethod
+    def _response(response):
         if response.status_code >= 400:
             raise Exception(f"Supabase Error: {response.text}")
             
@@ -139,6 +198,19 @@ class SupabaseQueryBuilder:
         except:
             return Response({})
 
+    def _stage(self):
+        return "supabase_upsert" if hasattr(self, 'data') else "supabase_select"
+
+    def execute(self):
+        with stage(self._stage()):
+            response = self.client.http.request(**self._request())
+        return self._response(response)
+
+    async def aexecute(self):
+        with stage(self._stage()):
+            response = await self.client.ahttp.request(**self._request())
+        return self._response(response)
+
 class SupabaseStorage:
     def __init__(self, client):
         self.client = client
@@ -151,13 +223,11 @@ class SupabaseStorageBucket:
         self.client = client
         self.bucket = bucket
         
-    def remove(self, paths):
+    def _remove_request(self, paths):
         url = f"{self.client.url}/storage/v1/object/{self.bucket}"
-        headers = self.client.headers.copy()
-        response = requests.delete(url, headers=headers, json={"prefixes": paths})
-        return response
-        
-    def upload(self, path, file, file_options=None):
+        return dict(method="DELETE", url=url, headers=self.client.headers.copy(), json={"prefixes": paths})
+
+    def _upload_request(self, path, file, file_options=None):
         url = f"{self.client.url}/storage/v1/object/{self.bucket}/{path}"
         headers = {
             "apikey": self.client.key,
@@ -165,14 +235,30 @@ class SupabaseStorageBucket:
         }
         if file_options:
             headers.update(file_options)
-            
         # file is bytes
-        response = requests.post(url, headers=headers, data=file)
-        
+        return dict(method="POST", url=url, headers=headers, content=file)
+
+    @staticmethod
+    def _upload_response(response):
         if response.status_code >= 400:
             raise Exception(f"Storage Error: {response.text}")
         return response
 
+    def remove(self, paths):
+        return self.client.http.request(**self._remove_request(paths))
+
+    async def aremove(self, paths):
+        with stage("supabase_storage_remove"):
+            return await self.client.ahttp.request(**self._remove_request(paths))
+        
+    def upload(self, path, file, file_options=None):
+        return self._upload_response(self.client.http.request(**self._upload_request(path, file, file_options)))
+
+    async def aupload(self, path, file, file_options=None):
+        with stage("supabase_storage_upload"):
+            response = await self.client.ahttp.request(**self._upload_request(path, file, file_options))
+        return self._upload_response(response)
+
 class Response:
     def __init__(self, data):
         self.data = data
@@ -0,0 +1,332 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from collections import OrderedDict, deque
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .llm_cache import CACHE_DIR
+
+TASK_DB_PATH = os.getenv("TASK_DB_PATH", os.path.join(CACHE_DIR, "tasks.sqlite3"))
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "8"))
+TASK_RESULT_TTL = int(os.getenv("TASK_RESULT_TTL", "3600"))
+TASK_MAX_QUEUED_PER_USER = int(os.getenv("TASK_MAX_QUEUED_PER_USER", "20"))
+TASK_CLEANUP_INTERVAL = float(os.getenv("TASK_CLEANUP_INTERVAL", "60"))
+# A 'running' row older than this is assumed orphaned (its process died) and is re-queued
+# by start(); keep it above the longest task so another app process never steals live work.
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "900"))
+
+class TaskRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TaskFailed(Exception):
+    # Raised by handlers for expected failures; the message is stored as the task error.
+    pass
+
+
+def dedupe_key(kind: str, owner: str, payload: dict, content: Optional[bytes]) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps([kind, owner, payload], sort_keys=True).encode("utf-8"))
+    if content is not None:
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+class TaskQueue:
+    """In-process async workers over a durable SQLite task table.
+
+    - ``submit`` returns at once; an identical pending or finished submission from the
+      same owner returns the existing task instead of queueing another (pending only,
+      with ``dedupe_finished=False``);
+    - workers take tasks round-robin across owners, so one user's burst can't starve others;
+    - queued tasks, and running ones whose lease has expired, survive a restart and are
+      picked up again by ``start``; a task is claimed with a conditional UPDATE, so app
+      processes sharing the table never run the same task twice;
+    - finished tasks are kept for ``ttl`` seconds, then removed.
+
+    SQLite work runs in the threadpool, never on the event loop.
+    """
+
+    def __init__(self, path, workers=8, ttl=3600, max_queued_per_owner=20, lease=900):
+        self.path = path
+        self.workers = workers
+        self.ttl = ttl
+        self.max_queued_per_owner = max_queued_per_owner
+        self.lease = lease
+        self.handlers = {}
+        self._local = threading.local()
+        self._submit_lock = threading.Lock()
+        self._queues = OrderedDict()  # owner -> deque of task ids
+        self._running = set()
+        self._ready = None
+        self._tasks = []
+        self.completed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT NOT NULL,"
+                " dedupe_key TEXT NOT NULL, status TEXT NOT NULL,"
+                " payload TEXT NOT NULL, content BLOB, result TEXT, error TEXT,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL, expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_dedupe ON tasks(dedupe_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_expires ON tasks(expires_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def register(self, kind: str, handler):
+        # handler: async (payload: dict, content: Optional[bytes]) -> dict
+        self.handlers[kind] = handler
+
+    def _enqueue(self, owner, task_id):
+        if self._ready is None:
+            return  # stopped meanwhile; the row stays queued for the next start()
+        self._queues.setdefault(owner, deque()).append(task_id)
+        self._ready.release()
+
+    def _next(self):
+        owner, queue = next(iter(self._queues.items()))
+        task_id = queue.popleft()
+        if queue:
+            self._queues.move_to_end(owner)
+        else:
+            del self._queues[owner]
+        return task_id
+
+    def _find_or_insert(self, kind, owner, key, payload, content, queued, dedupe_finished):
+        # (row, created). Lookup and insert happen under one lock, so concurrent duplicate
+        # submissions can't both create a task.
+        now = time.time()
+        conn = self._conn()
+        statuses = "status != 'failed'" if dedupe_finished else "status IN ('queued', 'running')"
+        with self._submit_lock:
+            row = conn.execute(
+                f"SELECT * FROM tasks WHERE dedupe_key = ? AND {statuses}"
+                " AND (expires_at IS NULL OR expires_at > ?) ORDER BY created_at DESC LIMIT 1",
+                (key, now),
+            ).fetchone()
+            if row is not None:
+                return row, False
+
+            if queued >= self.max_queued_per_owner:
+                raise TaskRejected(429, f"At most {self.max_queued_per_owner} queued tasks per user.")
+
+            task_id = uuid.uuid4().hex
+            with conn:
+                conn.execute(
+                    "INSERT INTO tasks (id, kind, owner, dedupe_key, status, payload, content, created_at)"
+                    " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                    (task_id, kind, owner, key, json.dumps(payload), content, now),
+                )
+            return conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone(), True
+
+    async def submit(self, kind: str, owner: str, payload: dict, content: Optional[bytes] = None,
+                     dedupe_finished: bool = True):
+        # Returns (task, deduplicated).
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for task kind {kind!r}")
+        if self._ready is None:
+            raise TaskRejected(503, "Task workers are not running.")
+
+        key = dedupe_key(kind, owner, payload, content)
+        queued = len(self._queues.get(owner, ()))
+        row, created = await run_in_threadpool(
+            self._find_or_insert, kind, owner, key, payload, content, queued, dedupe_finished
+        )
+        if not created:
+            self.deduplicated += 1
+            return self._describe(row), True
+        self._enqueue(owner, row["id"])
+        return self._describe(row), False
+
+    def _load(self, task_id):
+        return self._conn().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+
+    async def get(self, task_id: str, with_result: bool = False) -> Optional[dict]:
+        row = await run_in_threadpool(self._load, task_id)
+        if row is None or (row["expires_at"] and row["expires_at"] < time.time()):
+            return None
+        return self._describe(row, with_result)
+
+    def _describe(self, row, with_result=False) -> dict:
+        task = {
+            "task_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+            "expires_at": _iso(row["expires_at"]),
+        }
+        if row["status"] == "queued":
+            task["queue_position"] = self._position(row["owner"], row["id"])
+        if with_result:
+            task["result"] = json.loads(row["result"]) if row["result"] else None
+            task["error"] = row["error"]
+        return task
+
+    def _position(self, owner, task_id):
+        queue = self._queues.get(owner)
+        if not queue or task_id not in queue:
+            return None
+        return list(queue).index(task_id) + 1
+
+    def _finish(self, task_id, status, result=None, error=None):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            # the upload is only needed to run the task
+            conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, content = NULL,"
+                " finished_at = ?, expires_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, now + self.ttl, task_id),
+            )
+
+    def _claim(self, task_id):
+        # The task row if this process won it, else None (finished, or another app
+        # process sharing the table got there first).
+        conn = self._conn()
+        with conn:
+            claimed = conn.execute(
+                "UPDATE tasks SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), task_id),
+            ).rowcount == 1
+        if not claimed:
+            return None
+        return conn.execute("SELECT kind, payload, content FROM tasks WHERE id = ?", (task_id,)).fetchone()
+
+    async def _run(self, task_id):
+        row = await run_in_threadpool(self._claim, task_id)
+        if row is None:
+            return
+        self._running.add(task_id)
+        try:
+            result = await self.handlers[row["kind"]](json.loads(row["payload"]), row["content"])
+        except asyncio.CancelledError:
+            raise  # stop() hands it back to the queue
+        except TaskFailed as e:
+            self.failed += 1
+            await run_in_threadpool(self._finish, task_id, "failed", None, str(e))
+        except Exception as e:
+            self.failed += 1
+            print(f"Task {task_id} ({row['kind']}) failed: {e}")
+            await run_in_threadpool(self._finish, task_id, "failed", None, f"Task failed: {e}")
+        else:
+            await run_in_threadpool(self._finish, task_id, "succeeded", result)
+            self.completed += 1
+        finally:
+            self._running.discard(task_id)
+
+    async def _worker(self):
+        # One bad iteration (e.g. sqlite "database is locked") must not kill the worker
+        # and shrink the pool; fail that task and keep going.
+        while True:
+            await self._ready.acquire()
+            task_id = None
+            try:
+                task_id = self._next()
+                await self._run(task_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Task worker error on {task_id}: {e}")
+                if task_id is not None:
+                    self.failed += 1
+                    try:
+                        await run_in_threadpool(self._finish, task_id, "failed", None, f"Task failed: {e}")
+                    except Exception as e:
+                        # stays 'running' until its lease expires and start() re-queues it
+                        print(f"Could not mark task {task_id} failed: {e}")
+
+    async def _cleanup(self):
+        while True:
+            await asyncio.sleep(TASK_CLEANUP_INTERVAL)
+            try:
+                await run_in_threadpool(self._delete_expired)
+            except Exception as e:
+                print(f"Task cleanup failed: {e}")
+
+    def _delete_expired(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM tasks WHERE expires_at < ?", (time.time(),))
+
+    def start(self):
+        self._ready = asyncio.Semaphore(0)
+        conn = self._conn()
+        with conn:
+            orphaned = conn.execute(
+                "UPDATE tasks SET status = 'queued', started_at = NULL WHERE status = 'running' AND started_at < ?",
+                (time.time() - self.lease,),
+            ).rowcount
+        rows = conn.execute("SELECT id, owner FROM tasks WHERE status = 'queued' ORDER BY created_at").fetchall()
+        if rows:
+            print(f"Re-queued {len(rows)} unfinished tasks ({orphaned} with an expired lease)")
+        for row in rows:
+            self._enqueue(row["owner"], row["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._running:
+            # interrupted here, so free to run again at once rather than after the lease
+            ids = list(self._running)
+            with self._conn() as conn:
+                conn.execute(
+                    f"UPDATE tasks SET status = 'queued', started_at = NULL WHERE status = 'running'"
+                    f" AND id IN ({','.join('?' * len(ids))})",
+                    ids,
+                )
+            self._running.clear()
+        self._queues.clear()
+        self._ready = None
+
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _status_counts(self):
+        return dict(self._conn().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    async def stats(self) -> dict:
+        counts = await run_in_threadpool(self._status_counts)
+        return {
+            "workers": self.workers,
+            "queued": self.queued(),
+            "owners_waiting": len(self._queues),
+            "by_status": counts,
+            "completed": self.completed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "result_ttl_seconds": self.ttl,
+        }
+
+
+task_queue = TaskQueue(TASK_DB_PATH, TASK_WORKERS, TASK_RESULT_TTL, TASK_MAX_QUEUED_PER_USER, TASK_LEASE_SECONDS)
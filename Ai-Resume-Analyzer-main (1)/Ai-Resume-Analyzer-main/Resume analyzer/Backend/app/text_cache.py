@@ -0,0 +1,142 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")  # disk tier is off unless this is set
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class PDFTextCache:
+    """Extracted PDF text keyed by the SHA-256 of the uploaded bytes.
+
+    Two tiers: a bounded in-memory LRU and an optional directory of
+    ``<sha>.txt`` files evicted oldest-first once it grows past ``disk_max_bytes``.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None, disk_max_bytes=200 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        text = self._disk_get(key)
+        if text is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            self._memory_put(key, text)
+            return text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        self._memory_put(key, text)
+        self._disk_put(key, text)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self.disk_dir is not None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.txt"):
+                path.unlink(missing_ok=True)
+
+    def _memory_put(self, key, text):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.txt"
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # bump mtime so eviction is least-recently-used
+            return text
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"PDF cache read failed: {e}")
+            return None
+
+    def _disk_put(self, key, text):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except Exception as e:
+            print(f"PDF cache write failed: {e}")
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for path in self.disk_dir.glob("*.txt"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.disk_max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+pdf_text_cache = PDFTextCache(
+    max_entries=PDF_CACHE_MAX_ENTRIES,
+    disk_dir=PDF_CACHE_DIR,
+    disk_max_bytes=PDF_CACHE_DISK_MAX_BYTES,
+)
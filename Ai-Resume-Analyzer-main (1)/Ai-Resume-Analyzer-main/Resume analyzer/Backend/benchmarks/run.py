@@ -0,0 +1,279 @@
+"""Micro-benchmarks for the backend hot paths.
+
+Run from the Backend directory:
+
+    python -m benchmarks.run                  # everything, compared against baseline.json
+    python -m benchmarks.run --quick          # skip the 100k-job, 10k-skill and 20-page layout-mode cases
+    python -m benchmarks.run --only rank_jobs
+    python -m benchmarks.run --save-baseline  # record this machine's numbers as the baseline
+
+Each case reports throughput, p50/p99 latency and the peak memory allocated by one call
+(tracemalloc: Python and numpy allocations, not pdfium's own C heap). A case whose p50 or peak memory is worse than the baseline by more than the
+tolerance is marked REGRESSION and the run exits with status 1. Timings are only
+comparable on the machine that recorded the baseline.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tracemalloc
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+# Nothing here talks to Groq, but importing app.adzuna_service builds the client.
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from app.resume_parser import extract_text_from_pdf, parse_resume_text, extract_skills
+from app.skill_engine import default_taxonomy
+from app.matcher import JobIndex, rank_jobs
+from app.adzuna_service import transform_adzuna_results
+from . import synthetic
+
+BENCH_DIR = os.path.dirname(__file__)
+UPLOADS_DIR = os.path.join(BENCH_DIR, "..", "app", "uploads")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+BENCH_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.30"))
+BENCH_MEMORY_TOLERANCE = float(os.getenv("BENCH_MEMORY_TOLERANCE", "0.20"))
+# Differences below these are noise, whatever the percentage says.
+MIN_TIME_DELTA_MS = 0.05
+MIN_MEMORY_DELTA_KB = 64
+
+
+class Case(NamedTuple):
+    name: str
+    items: int  # units of work per call, for throughput (pages, jobs, ...)
+    unit: str
+    setup: Callable[[], Callable[[], object]]  # builds inputs, returns the call to time
+    large: bool = False  # skipped by --quick
+
+
+def _pdf_cases():
+    uploads = sorted(os.path.join(UPLOADS_DIR, f) for f in os.listdir(UPLOADS_DIR) if f.lower().endswith(".pdf"))
+    big_pdf = synthetic.text_pdf(synthetic.resume_text(pages=20))
+    cases = []
+    for fast in (True, False):
+        mode = "fast" if fast else "layout"
+        cases.append(Case(
+            f"extract_text_from_pdf[{mode},uploads x{len(uploads)}]", len(uploads), "files",
+            lambda fast=fast: lambda: [extract_text_from_pdf(path, fast) for path in uploads],
+        ))
+        cases.append(Case(
+            f"extract_text_from_pdf[{mode},synthetic 20p]", 20, "pages",
+            # a fresh stream per call, as the upload path does
+            lambda fast=fast: lambda: extract_text_from_pdf(io.BytesIO(big_pdf), fast),
+            large=not fast,
+        ))
+    return cases
+
+
+def _parse_cases():
+    cases = []
+    for pages in (1, 20):
+        def setup(pages=pages):
+            text = synthetic.resume_text(pages=pages)
+            return lambda: parse_resume_text(text)
+        cases.append(Case(f"parse_resume_text[{pages}p]", 1, "resumes", setup))
+    return cases
+
+
+def _skill_cases():
+    cases = []
+    default_size = len(default_taxonomy())
+    for size in (default_size, 100, 1000, 10000):
+        for pages in (1, 20):
+            def setup(size=size, pages=pages):
+                skills = None if size == default_size else synthetic.skill_names(size)
+                text = synthetic.resume_text(pages=pages, skills=skills or list(default_taxonomy()))
+                return lambda: extract_skills(text, skills)
+            cases.append(Case(f"extract_skills[taxonomy={size},{pages}p]", 1, "resumes", setup, large=size >= 10000))
+    return cases
+
+
+def _rank_cases():
+    def default_setup():
+        text = synthetic.resume_text(pages=2)
+        return lambda: rank_jobs(text)
+
+    cases = [Case("rank_jobs[jobs.json]", 1, "queries", default_setup)]
+    for size in (1000, 10000, 100000):
+        def setup(size=size):
+            vocabulary = synthetic.Vocabulary()
+            index = JobIndex().fit(synthetic.job_corpus(size, vocabulary=vocabulary))
+            text = synthetic.resume_text(pages=2, skills=synthetic.skill_names(300), vocabulary=vocabulary)
+            return lambda: index.rank(text, 5)
+        cases.append(Case(f"rank_jobs[{size} jobs]", size, "jobs", setup, large=size >= 100000))
+    return cases
+
+
+def _transform_cases():
+    cases = []
+    for size in (50, 500, 2000):
+        def setup(size=size):
+            results = synthetic.adzuna_results(size)
+            skills = ["Python", "FastAPI", "Docker", "SQL", "AWS"]
+            text = synthetic.resume_text(pages=2)
+            return lambda: transform_adzuna_results(results, skills, text)
+        cases.append(Case(f"transform_adzuna_results[{size} jobs]", size, "jobs", setup))
+    return cases
+
+
+def all_cases():
+    return _pdf_cases() + _parse_cases() + _skill_cases() + _rank_cases() + _transform_cases()
+
+
+def measure(fn, min_time=1.0, min_samples=5, max_samples=500):
+    # Warm up (lazy imports, lru-cached matchers, page caches); calls slower than min_time
+    # get one warm-up call and fewer samples so the layout-mode PDF cases stay bearable.
+    t0 = time.perf_counter()
+    fn()
+    if time.perf_counter() - t0 < min_time:
+        fn()
+    else:
+        min_samples = 3
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+
+    # One extra traced call for memory: tracemalloc slows allocation-heavy code, so it is
+    # kept out of the timed samples.
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples = np.asarray(samples)
+    return {
+        "samples": len(samples),
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "peak_mem_kb": round((peak - before) / 1024, 1),
+    }
+
+
+def compare(result, base, tolerance, memory_tolerance):
+    # Returns (p50 change, memory change, regressed) against a baseline entry.
+    if not base:
+        return None, None, False
+    time_delta = result["p50_ms"] - base["p50_ms"]
+    mem_delta = result["peak_mem_kb"] - base["peak_mem_kb"]
+    time_change = time_delta / base["p50_ms"] if base["p50_ms"] else 0.0
+    mem_change = mem_delta / base["peak_mem_kb"] if base["peak_mem_kb"] else 0.0
+    regressed = (
+        (time_change > tolerance and time_delta > MIN_TIME_DELTA_MS)
+        or (mem_change > memory_tolerance and mem_delta > MIN_MEMORY_DELTA_KB)
+    )
+    return time_change, mem_change, regressed
+
+
+def _pct(change):
+    return "      -" if change is None else f"{change * 100:+6.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="skip the largest corpora/taxonomies")
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE, help="allowed p50 slowdown (0.3 = 30%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=BENCH_MEMORY_TOLERANCE)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds of samples per case")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in all_cases() if not (args.quick and c.large)]
+    if args.only:
+        cases = [c for c in cases if any(pattern in c.name for pattern in args.only)]
+    if not cases:
+        parser.error("no benchmark matches")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+
+    print(f"{'case':<52} {'n':>4} {'throughput':>18} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10} {'p50 vs base':>11} {'mem vs base':>11}")
+    results, regressions = {}, []
+    for case in cases:
+        t0 = time.perf_counter()
+        fn = case.setup()
+        setup_s = time.perf_counter() - t0
+        base = baseline.get(case.name)
+        result = measure(fn, min_time=args.min_time)
+        time_change, mem_change, regressed = compare(result, base, args.tolerance, args.memory_tolerance)
+        if regressed:
+            # Confirm before failing: a single noisy window (another process, a GC pause)
+            # shouldn't fail the run; keep the better of the two measurements.
+            retry = measure(fn, min_time=args.min_time)
+            if retry["p50_ms"] < result["p50_ms"]:
+                result = retry
+            time_change, mem_change, regressed = compare(result, base, args.tolerance, args.memory_tolerance)
+        result["throughput"] = round(case.items * 1000 / result["mean_ms"], 2) if result["mean_ms"] else None
+        result["unit"] = f"{case.unit}/s"
+        result["setup_s"] = round(setup_s, 2)
+        results[case.name] = result
+        if regressed:
+            regressions.append(case.name)
+        throughput = f"{result['throughput']:,.1f} {case.unit}/s"
+        print(
+            f"{case.name:<52} {result['samples']:>4} {throughput:>18} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f}"
+            f" {result['peak_mem_kb']:>10.1f} {_pct(time_change):>11} {_pct(mem_change):>11}"
+            + ("  REGRESSION" if regressed else "")
+        )
+        sys.stdout.flush()
+
+    print(f"\nprocess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    missing = [c.name for c in cases if c.name not in baseline]
+    if baseline and missing:
+        print(f"{len(missing)} case(s) not in the baseline: {', '.join(missing)}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "cases": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        # Merge, so a partial run (--only/--quick) only replaces the cases it ran.
+        merged = dict(baseline)
+        merged.update(results)
+        report["cases"] = dict(sorted(merged.items()))
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} REGRESSION(S) beyond {args.tolerance:.0%} p50 / {args.memory_tolerance:.0%} memory:")
+        for name in regressions:
+            print(f"  - {name}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import random
+
+from app.skill_engine import default_taxonomy
+
+# Deterministic generators for benchmark inputs: the same seed always gives the same
+# resumes, taxonomies, job corpora and Adzuna payloads, so timings stay comparable.
+
+_ONSETS = ["b", "br", "c", "d", "dr", "f", "g", "gr", "k", "l", "m", "n", "p", "pr", "qu", "r", "s", "st", "t", "tr", "v", "z"]
+_VOWELS = ["a", "e", "i", "o", "u", "ai", "io"]
+_CODAS = ["", "n", "r", "x", "s", "l", "th"]
+
+_ROLES = ["Backend Developer", "Data Scientist", "Frontend Engineer", "DevOps Engineer", "ML Engineer",
+          "Full Stack Developer", "Data Analyst", "Platform Engineer", "QA Engineer", "Mobile Developer"]
+_CITIES = ["Bangalore", "Hyderabad", "Pune", "Chennai", "Mumbai", "Delhi", "Remote"]
+_SKILL_PREFIXES = ["Apache", "Google", "Azure", "Open", "Cloud", "Graph", "Hyper", "Micro", "Auto", "Deep"]
+
+
+def _words(rng, count):
+    words = set()
+    while len(words) < count:
+        syllables = rng.randint(2, 3)
+        words.add("".join(rng.choice(_ONSETS) + rng.choice(_VOWELS) + rng.choice(_CODAS) for _ in range(syllables)))
+    return sorted(words)
+
+
+class Vocabulary:
+    """Zipf-weighted filler words, so TF-IDF sees realistic document frequencies."""
+
+    def __init__(self, size=3000, seed=7):
+        rng = random.Random(seed)
+        self.words = _words(rng, size)
+        rng.shuffle(self.words)
+        self.weights = [1.0 / (rank + 1) for rank in range(size)]
+
+    def sample(self, rng, count):
+        return rng.choices(self.words, weights=self.weights, k=count)
+
+
+def skill_names(count, seed=11):
+    # The real taxonomy first, then made-up but plausible names ("Apache Stravon", "Kelmix").
+    names = list(default_taxonomy())
+    rng = random.Random(seed)
+    for word in _words(rng, count):
+        if len(names) >= count:
+            break
+        prefix = rng.choice(_SKILL_PREFIXES) if rng.random() < 0.4 else ""
+        names.append(f"{prefix} {word.capitalize()}".strip())
+    return names[:count]
+
+
+def resume_text(pages=1, skills=None, seed=1, vocabulary=None):
+    # Roughly 50 lines per page: contact header, summary, experience bullets that mention
+    # skills, education and a skills line.
+    rng = random.Random(seed)
+    vocabulary = vocabulary or Vocabulary()
+    skills = list(skills or default_taxonomy())
+    lines = [
+        f"{rng.choice(['Asha', 'Ravi', 'Meera', 'Arjun'])} {rng.choice(['Rao', 'Iyer', 'Shah', 'Menon'])}",
+        f"candidate{seed}@example.com | +91 98{rng.randint(10000000, 99999999)} | {rng.choice(_CITIES)}",
+        "SUMMARY",
+        f"{rng.choice(_ROLES)} with {rng.randint(1, 12)} years of experience in " + ", ".join(rng.sample(skills, min(4, len(skills)))) + ".",
+        "EXPERIENCE",
+    ]
+    while len(lines) < 50 * pages - 6:
+        if rng.random() < 0.1:
+            lines.append(f"{rng.choice(_ROLES)} - {' '.join(vocabulary.sample(rng, 2)).title()} Pvt Ltd (20{rng.randint(10, 24)} - Present)")
+            continue
+        words = vocabulary.sample(rng, rng.randint(8, 14))
+        for skill in rng.sample(skills, min(rng.randint(1, 3), len(skills))):
+            words.insert(rng.randrange(len(words) + 1), skill)
+        lines.append("- " + " ".join(words).capitalize() + ".")
+    lines += [
+        "EDUCATION",
+        f"B.Tech in Computer Science, {rng.choice(_CITIES)} Institute of Technology, 20{rng.randint(5, 20):02d}",
+        "SKILLS",
+        ", ".join(rng.sample(skills, min(12, len(skills)))),
+    ]
+    return "\n".join(lines)
+
+
+def job_corpus(count, seed=3, vocabulary=None):
+    # Dicts shaped like app/jobs.json entries.
+    rng = random.Random(seed)
+    vocabulary = vocabulary or Vocabulary()
+    skills = skill_names(300)
+    jobs = []
+    for i in range(count):
+        required = rng.sample(skills, rng.randint(3, 8))
+        jobs.append({
+            "id": f"bench-{i}",
+            "title": rng.choice(_ROLES),
+            "company": " ".join(vocabulary.sample(rng, 2)).title(),
+            "location": rng.choice(_CITIES),
+            "description": " ".join(vocabulary.sample(rng, rng.randint(30, 60))) + " " + " ".join(required[:2]),
+            "requirements": [s.lower() for s in required],
+        })
+    return jobs
+
+
+def adzuna_results(count, seed=5, vocabulary=None):
+    # Raw Adzuna /search results, including the <strong> highlighting in titles.
+    rng = random.Random(seed)
+    vocabulary = vocabulary or Vocabulary()
+    skills = skill_names(200)
+    results = []
+    for i in range(count):
+        role = rng.choice(_ROLES)
+        if rng.random() < 0.3:
+            role = role.replace("Developer", "<strong>Developer</strong>")
+        words = vocabulary.sample(rng, rng.randint(25, 45))
+        for skill in rng.sample(skills, rng.randint(2, 6)):
+            words.insert(rng.randrange(len(words) + 1), skill)
+        results.append({
+            "id": str(4000000000 + i),
+            "title": role,
+            "description": " ".join(words),
+            "company": {"display_name": " ".join(vocabulary.sample(rng, 2)).title()},
+            "location": {"display_name": f"{rng.choice(_CITIES)}, India"},
+            "redirect_url": f"https://www.adzuna.in/details/{4000000000 + i}",
+            "salary_min": rng.randint(4, 30) * 100000,
+        })
+    return results
+
+
+def _pdf_escape(line):
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_pdf(text, lines_per_page=50):
+    # A minimal PDF with a real text layer (Helvetica, one text object per page), enough for
+    # both pdfium and pdfplumber; avoids a PDF-writing dependency just for benchmarks.
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for n, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        kids.append(f"{page_id} 0 R")
+        body = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page_lines) + " ET"
+        stream = body.encode("latin-1")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode("latin-1") + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
@@ -0,0 +1,318 @@
+"""Async load driver for the four user-facing endpoints.
+
+    python -m loadtest.driver --url http://127.0.0.1:8000 --jwt-secret <SUPABASE_JWT_SECRET> \\
+                              --users 50 --ramp 30 --duration 60
+
+Virtual users are added linearly over ``--ramp`` seconds and then held for ``--duration``.
+Each user first saves a profile resume, then loops over a weighted mix of /analyze_ats,
+/generate_resume, /jobs/recommend and /profile/resume with an exponential think time.
+A separate probe requests /openapi.json every 100 ms: its latency is how long a
+cheap request waits on the app's event loop, so blocking work shows up there first.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+
+import httpx
+import jwt
+import numpy as np
+
+UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "uploads")
+PROBE_INTERVAL = 0.1
+
+ENDPOINTS = ("profile", "analyze_ats", "generate_resume", "jobs_recommend")
+ENDPOINT_PATHS = {
+    "profile": "/profile/resume",
+    "analyze_ats": "/analyze_ats",
+    "generate_resume": "/generate_resume",
+    "jobs_recommend": "/jobs/recommend",
+}
+
+
+DEFAULT_MIX = "profile=1,analyze_ats=4,generate_resume=2,jobs_recommend=3"
+
+JOB_DESCRIPTIONS = [
+    "We are hiring a Python backend developer with FastAPI, PostgreSQL, Docker and AWS experience. "
+    "You will design REST APIs, write tests and own services in production. 3+ years required.",
+    "Looking for a data scientist comfortable with Python, pandas, scikit-learn and SQL to build "
+    "forecasting models and communicate results to product teams. Experience with MLOps is a plus.",
+    "Full stack engineer: React and TypeScript on the frontend, Node.js or Python services on the "
+    "backend, CI/CD with GitHub Actions, and Kubernetes deployments on GCP.",
+]
+
+
+def mint_token(secret: str, user_id: str, ttl: int = 3600) -> str:
+    # Same claims Supabase puts in an access token, signed with the project's JWT secret.
+    now = int(time.time())
+    claims = {"sub": user_id, "aud": "authenticated", "role": "authenticated", "iat": now, "exp": now + ttl}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r} in mix; expected one of {', '.join(ENDPOINTS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def load_pdfs():
+    return [
+        (name, open(os.path.join(UPLOADS_DIR, name), "rb").read())
+        for name in sorted(os.listdir(UPLOADS_DIR)) if name.lower().endswith(".pdf")
+    ]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)  # endpoint -> [(finished_at, latency_s, status)]
+        self.probe = []
+
+    def add(self, endpoint, started, status):
+        now = time.perf_counter()
+        self.samples[endpoint].append((now, now - started, status))
+
+
+class VirtualUser:
+    def __init__(self, index, driver):
+        self.index = index
+        self.driver = driver
+        self.user_id = f"load-{driver.run_id}-{index}"
+        self.headers = {"Authorization": f"Bearer {mint_token(driver.jwt_secret, self.user_id)}"} if driver.jwt_secret else {}
+        self.rng = random.Random(index)
+        self.has_profile = False
+
+    def pdf(self):
+        return self.rng.choice(self.driver.pdfs)
+
+    async def profile(self, client):
+        name, content = self.pdf()
+        response = await client.post("/profile/resume", headers=self.headers, files={"file": (name, content, "application/pdf")})
+        self.has_profile = self.has_profile or response.status_code == 200
+        return response
+
+    async def analyze_ats(self, client):
+        name, content = self.pdf()
+        data = {
+            "job_description": self.rng.choice(JOB_DESCRIPTIONS),
+            "mode": self.driver.ats_mode,
+            "use_cache": str(self.driver.use_cache).lower(),
+        }
+        return await client.post("/analyze_ats", data=data, files={"file": (name, content, "application/pdf")})
+
+    async def generate_resume(self, client):
+        data = {
+            "full_name": f"Load User {self.index}",
+            "email": f"{self.user_id}@example.com",
+            "target_job_title": "Backend Developer",
+            "years_of_experience": str(self.rng.randint(1, 10)),
+            "skills": "Python, FastAPI, SQL, Docker, AWS",
+            "work_experience": "Built and ran REST APIs for a payments product; led a migration to containers.",
+            "education": "B.Tech Computer Science",
+            "job_description": self.rng.choice(JOB_DESCRIPTIONS),
+        }
+        return await client.post("/generate_resume", data=data)
+
+    async def jobs_recommend(self, client):
+        data = {"location": self.rng.choice(["India", "Bangalore", "Remote"])}
+        if self.has_profile:
+            data["use_profile"] = "true"
+            return await client.post("/jobs/recommend", headers=self.headers, data=data)
+        name, content = self.pdf()
+        return await client.post("/jobs/recommend", headers=self.headers, data=data, files={"file": (name, content, "application/pdf")})
+
+    async def call(self, client, endpoint):
+        started = time.perf_counter()
+        try:
+            response = await getattr(self, endpoint)(client)
+            status = response.status_code
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.driver.recorder.add(ENDPOINT_PATHS[endpoint], started, status)
+
+    async def run(self, client, stop_at):
+        await self.call(client, "profile")
+        endpoints, weights = zip(*self.driver.mix.items())
+        while time.perf_counter() < stop_at:
+            await asyncio.sleep(self.rng.expovariate(1 / self.driver.think_time) if self.driver.think_time else 0)
+            if time.perf_counter() >= stop_at:
+                break
+            await self.call(client, self.rng.choices(endpoints, weights)[0])
+
+
+class LoadDriver:
+    def __init__(self, url, jwt_secret=None, users=20, ramp=10.0, duration=30.0, think_time=1.0,
+                 mix=DEFAULT_MIX, ats_mode="llm", use_cache=False, timeout=120.0, report_every=5.0):
+        self.url = url.rstrip("/")
+        self.jwt_secret = jwt_secret
+        self.users = users
+        self.ramp = ramp
+        self.duration = duration
+        self.think_time = think_time
+        self.mix = parse_mix(mix)
+        self.ats_mode = ats_mode
+        self.use_cache = use_cache
+        self.timeout = timeout
+        self.report_every = report_every
+        self.run_id = f"{int(time.time()) % 100000}"
+        self.pdfs = load_pdfs()
+        self.recorder = Recorder()
+        self.active = 0
+
+    async def _probe(self, client, stop_at):
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                await client.get("/openapi.json")
+                self.recorder.probe.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                self.recorder.probe.append(float("inf"))
+            await asyncio.sleep(max(0.0, PROBE_INTERVAL - (time.perf_counter() - started)))
+
+    async def _user(self, client, index, stop_at):
+        self.active += 1
+        try:
+            await VirtualUser(index, self).run(client, stop_at)
+        finally:
+            self.active -= 1
+
+    async def _timeline(self, started, stop_at):
+        # One line per interval: active users, completed requests/s, errors, window p99.
+        last = started
+        while time.perf_counter() < stop_at:
+            await asyncio.sleep(self.report_every)
+            now = time.perf_counter()
+            window = [(lat, status) for samples in self.recorder.samples.values() for (t, lat, status) in samples if last <= t < now]
+            errors = sum(1 for _, status in window if not _ok(status))
+            p99 = np.percentile([lat for lat, _ in window], 99) * 1000 if window else 0.0
+            print(f"  t={now - started:6.1f}s users={self.active:4d} rps={len(window) / (now - last):7.1f} errors={errors:4d} p99={p99:8.1f}ms")
+            sys.stdout.flush()
+            last = now
+
+    async def run(self):
+        limits = httpx.Limits(max_connections=self.users + 4, max_keepalive_connections=self.users + 4)
+        async with httpx.AsyncClient(base_url=self.url, timeout=self.timeout, limits=limits) as client:
+            started = time.perf_counter()
+            stop_at = started + self.ramp + self.duration
+            background = [
+                asyncio.create_task(self._probe(client, stop_at)),
+                asyncio.create_task(self._timeline(started, stop_at)),
+            ]
+            users = []
+            for i in range(self.users):
+                # linear ramp: user i starts at i/users of the ramp
+                delay = started + self.ramp * i / self.users - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                users.append(asyncio.create_task(self._user(client, i, stop_at)))
+            await asyncio.gather(*users)
+            self.elapsed = time.perf_counter() - started
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            try:
+                self.app_stats = (await client.get("/cache/stats")).json()
+            except Exception:
+                self.app_stats = None
+        return self.report()
+
+    def report(self) -> dict:
+        endpoints = {}
+        for path, samples in sorted(self.recorder.samples.items()):
+            latencies = np.array([lat for _, lat, _ in samples]) * 1000
+            statuses = defaultdict(int)
+            for _, _, status in samples:
+                statuses[str(status)] += 1
+            endpoints[path] = {
+                "requests": len(samples),
+                "ok": sum(1 for _, _, status in samples if _ok(status)),
+                "statuses": dict(statuses),
+                "throughput_rps": round(len(samples) / self.elapsed, 2),
+                **_percentiles(latencies),
+            }
+        probe = np.array(self.recorder.probe) * 1000
+        finite = probe[np.isfinite(probe)]
+        return {
+            "users": self.users,
+            "ramp_s": self.ramp,
+            "duration_s": self.duration,
+            "elapsed_s": round(self.elapsed, 2),
+            "endpoints": endpoints,
+            "event_loop_probe": dict(_percentiles(finite), samples=len(probe), failed=int(len(probe) - len(finite))),
+            "app_stats": self.app_stats,
+        }
+
+
+def _ok(status):
+    return isinstance(status, int) and status < 400
+
+
+def _percentiles(latencies_ms) -> dict:
+    if len(latencies_ms) == 0:
+        return {"p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+    return {"p50_ms": round(float(p50), 1), "p90_ms": round(float(p90), 1), "p99_ms": round(float(p99), 1), "max_ms": round(float(latencies_ms.max()), 1)}
+
+
+def print_report(report):
+    print(f"\n{report['users']} users, {report['elapsed_s']}s")
+    print(f"{'endpoint':<18} {'requests':>8} {'ok':>6} {'rps':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for path, row in report["endpoints"].items():
+        cells = [f"{row[k]:>9.1f}" if row[k] is not None else f"{'-':>9}" for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms")]
+        statuses = ", ".join(f"{k}:{v}" for k, v in sorted(row["statuses"].items()))
+        print(f"{path:<18} {row['requests']:>8} {row['ok']:>6} {row['throughput_rps']:>7.2f} {' '.join(cells)}  {statuses}")
+    probe = report["event_loop_probe"]
+    if probe["p50_ms"] is not None:
+        print(
+            f"event-loop probe   p50={probe['p50_ms']}ms p99={probe['p99_ms']}ms max={probe['max_ms']}ms"
+            f" ({probe['samples']} samples, {probe['failed']} failed)"
+        )
+
+
+def driver_args(parser):
+    parser.add_argument("--users", type=int, default=20, help="peak concurrent virtual users")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds to reach --users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to hold at --users")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds between a user's requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--ats-mode", default="llm", choices=["llm", "fast", "hybrid"])
+    parser.add_argument("--use-cache", action="store_true", help="let /analyze_ats hit the LLM result cache")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="also write the report to this file")
+
+
+def driver_from(args, url, jwt_secret):
+    return LoadDriver(
+        url, jwt_secret, users=args.users, ramp=args.ramp, duration=args.duration, think_time=args.think_time,
+        mix=args.mix, ats_mode=args.ats_mode, use_cache=args.use_cache, timeout=args.timeout,
+    )
+
+
+def write_json(path, report):
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive load against a running app.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--jwt-secret", default=os.getenv("SUPABASE_JWT_SECRET"), help="the app's SUPABASE_JWT_SECRET")
+    driver_args(parser)
+    args = parser.parse_args(argv)
+    report = asyncio.run(driver_from(args, args.url, args.jwt_secret).run())
+    print_report(report)
+    write_json(args.json, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""Local stand-ins for Groq, Supabase and Adzuna, with latency and error injection.
+
+    python -m loadtest.fakes --groq "latency=800,jitter=300,errors=0.02,status=429,tps=400" \\
+                             --supabase "latency=30" --adzuna "latency=250,errors=0.05"
+
+prints the environment to point the app at them. Each fake also serves GET /_stats:
+requests, injected errors, peak concurrency and the number of distinct client
+connections it saw (i.e. how well the app's HTTP pools reuse connections).
+"""
+import sys
+import json
+import time
+import zlib
+import base64
+import random
+import signal
+import socket
+import asyncio
+import argparse
+import threading
+from typing import NamedTuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from benchmarks import synthetic
+
+
+_FAULT_KEYS = {"latency": "latency_ms", "jitter": "jitter_ms", "errors": "error_rate", "status": "error_status", "tps": "tokens_per_s"}
+
+
+class Faults(NamedTuple):
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    tokens_per_s: float = 0.0  # Groq only: adds completion_tokens / tps of generation time
+
+    @classmethod
+    def parse(cls, spec: str, **defaults):
+        # "latency=800,jitter=200,errors=0.02,status=429"
+        values = dict(defaults)
+        for part in (spec or "").split(","):
+            if not part.strip():
+                continue
+            key, _, value = part.partition("=")
+            field = _FAULT_KEYS.get(key.strip())
+            if field is None:
+                raise ValueError(f"Unknown fault setting {key!r}; expected one of {', '.join(_FAULT_KEYS)}")
+            values[field] = int(value) if field == "error_status" else float(value)
+        return cls(**values)
+
+    def delay(self) -> float:
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms) / 1000
+
+
+def instrument(app: FastAPI, name: str, faults: Faults, error_body):
+    # Latency, injected errors and counters for every request except /_stats.
+    stats = {"requests": 0, "injected_errors": 0, "in_flight": 0, "peak_in_flight": 0}
+    connections = set()
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        if request.url.path == "/_stats":
+            return await call_next(request)
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        if request.client:
+            connections.add((request.client.host, request.client.port))
+        try:
+            await asyncio.sleep(faults.delay())
+            if faults.error_rate and random.random() < faults.error_rate:
+                stats["injected_errors"] += 1
+                headers = {"retry-after": "1"} if faults.error_status == 429 else None
+                return JSONResponse(error_body(faults.error_status), status_code=faults.error_status, headers=headers)
+            return await call_next(request)
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.get("/_stats")
+    async def service_stats():
+        return dict(stats, service=name, connections=len(connections), faults=faults._asdict())
+
+    return stats
+
+
+# --- Groq (OpenAI-compatible chat completions) -------------------------------------------
+
+def _groq_content(system_prompt: str) -> dict:
+    # Shaped like what each app prompt asks for, keyed off the system prompt's wording.
+    if "JOB TITLE" in system_prompt:
+        return {"role": "Backend Developer", "skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"]}
+    if "resume_text" in system_prompt:
+        return {
+            "ats_score": 82,
+            "resume_text": "ASHA RAO\nasha@example.com\n\nPROFESSIONAL SUMMARY\n" + "Backend developer building APIs. " * 40,
+            "skills_match_percentage": 78,
+            "missing_skills": ["Kubernetes"],
+            "optimization_notes": ["Quantify impact in the experience section."],
+        }
+    narrative = {
+        "strengths": ["Hands-on Python and FastAPI experience", "Ships production APIs"],
+        "weaknesses": ["Little cloud infrastructure work"],
+        "improvement_suggestions": ["Add measurable outcomes to each role"],
+    }
+    if "already been computed" in system_prompt:
+        return narrative
+    return dict(
+        narrative,
+        ats_score=random.randint(55, 90),
+        section_scores={"parsing": 18, "skills": 26, "experience": 18, "role_alignment": 8, "education": 8},
+        skills_match_percentage=random.randint(50, 90),
+        missing_skills=["Kubernetes", "Terraform"],
+        ats_warnings=[],
+        final_verdict="Moderate Match",
+    )
+
+
+def groq_app(faults: Faults) -> FastAPI:
+    app = FastAPI()
+    instrument(app, "groq", faults, lambda status: {"error": {"message": f"injected {status}", "type": "fake_error"}})
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        system_prompt = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        content = json.dumps(_groq_content(system_prompt))
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        completion_tokens = len(content) // 4
+        generation_s = completion_tokens / faults.tokens_per_s if faults.tokens_per_s else 0.0
+        created = int(time.time())
+        completion_id = f"chatcmpl-fake-{random.getrandbits(48):x}"
+        model = body.get("model", "fake")
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+        if not body.get("stream"):
+            await asyncio.sleep(generation_s)
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        async def chunks():
+            pieces = [content[i:i + 24] for i in range(0, len(content), 24)]
+            for i, piece in enumerate(pieces):
+                await asyncio.sleep(generation_s / len(pieces))
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if i == len(pieces) - 1 else None}],
+                }
+                if i == len(pieces) - 1:
+                    chunk["x_groq"] = {"usage": usage}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
+
+
+# --- Supabase (PostgREST, storage, auth) -------------------------------------------------
+
+def _jwt_claims(token: str):
+    # The fake trusts any well-formed token, like a Supabase project with the app's secret would.
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except Exception:
+        return None
+
+
+def supabase_app(faults: Faults, seed_profiles: int = 0) -> FastAPI:
+    app = FastAPI()
+    instrument(app, "supabase", faults, lambda status: {"message": f"injected {status}", "code": str(status)})
+    tables = {"profile_resumes": {}}
+    objects = {}
+    for i in range(seed_profiles):
+        user_id = f"seed-{i}"
+        tables["profile_resumes"][user_id] = {
+            "user_id": user_id, "filename": "resume.pdf", "uploaded_at": "2026-01-01T00:00:00",
+            "text": synthetic.resume_text(pages=1, seed=i), "storage_path": f"{user_id}/resume.pdf",
+        }
+
+    @app.get("/rest/v1/{table}")
+    async def select(table: str, request: Request):
+        params = dict(request.query_params)
+        columns = params.pop("select", "*")
+        order = params.pop("order", None)
+        limit = int(params.pop("limit", 0)) or None
+        offset = int(params.pop("offset", 0))
+        params.pop("on_conflict", None)
+        rows = list(tables.get(table, {}).values())
+        for column, condition in params.items():
+            op, _, value = condition.partition(".")
+            if op == "eq":
+                rows = [r for r in rows if str(r.get(column)) == value]
+        if order:
+            column, _, direction = order.partition(".")
+            rows.sort(key=lambda r: str(r.get(column) or ""), reverse=direction == "desc")
+        rows = rows[offset:offset + limit if limit else None]
+        if columns != "*":
+            wanted = [c.strip() for c in columns.split(",")]
+            rows = [{c: r.get(c) for c in wanted} for r in rows]
+        return rows
+
+    @app.post("/rest/v1/{table}")
+    async def upsert(table: str, request: Request):
+        data = await request.json()
+        key = request.query_params.get("on_conflict", "id")
+        store = tables.setdefault(table, {})
+        for row in data if isinstance(data, list) else [data]:
+            store[str(row.get(key))] = dict(store.get(str(row.get(key)), {}), **row)
+        return Response(status_code=201)
+
+    @app.post("/storage/v1/object/{bucket}/{path:path}")
+    async def upload(bucket: str, path: str, request: Request):
+        objects[(bucket, path)] = len(await request.body())
+        return {"Key": f"{bucket}/{path}"}
+
+    @app.delete("/storage/v1/object/{bucket}")
+    async def remove(bucket: str, request: Request):
+        prefixes = (await request.json()).get("prefixes", [])
+        removed = [p for p in prefixes if objects.pop((bucket, p), None) is not None]
+        return [{"name": p} for p in removed]
+
+    @app.get("/auth/v1/user")
+    async def user(request: Request):
+        claims = _jwt_claims(request.headers.get("authorization", "").replace("Bearer ", ""))
+        if not claims or "sub" not in claims:
+            return JSONResponse({"msg": "invalid JWT"}, status_code=401)
+        return {"id": claims["sub"], "email": claims.get("email"), "aud": claims.get("aud"),
+                "app_metadata": claims.get("app_metadata", {})}
+
+    @app.get("/auth/v1/.well-known/jwks.json")
+    async def jwks():
+        return {"keys": []}
+
+    return app
+
+
+# --- Adzuna ------------------------------------------------------------------------------
+
+def adzuna_app(faults: Faults) -> FastAPI:
+    app = FastAPI()
+    instrument(app, "adzuna", faults, lambda status: {"exception": "fake_error", "display": f"injected {status}"})
+    vocabulary = synthetic.Vocabulary()
+
+    @app.get("/v1/api/jobs/{country}/search/{page}")
+    async def search(country: str, page: int, request: Request):
+        what = request.query_params.get("what", "")
+        where = request.query_params.get("where", "")
+        count = int(request.query_params.get("results_per_page", "20"))
+        # Same query, same page -> same postings; ids are unique across queries and pages.
+        seed = zlib.crc32(f"{country}|{what.lower()}|{where.lower()}|{page}".encode("utf-8")) & 0xFFFFFFF
+        results = synthetic.adzuna_results(count, seed=seed, vocabulary=vocabulary)
+        for i, job in enumerate(results):
+            job["id"] = str(seed * 100 + i)
+            job["redirect_url"] = f"https://www.adzuna.{country}/details/{job['id']}"
+            if what and i % 2 == 0:
+                job["title"] = what.title()
+        return {"count": 5000, "mean": 1200000, "results": results}
+
+    return app
+
+
+# --- process -----------------------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeServers:
+    """The three fakes, each a uvicorn server on its own thread and port."""
+
+    def __init__(self, groq=Faults(), supabase=Faults(), adzuna=Faults(), seed_profiles=0, host="127.0.0.1"):
+        self.host = host
+        self.apps = {
+            "groq": groq_app(groq),
+            "supabase": supabase_app(supabase, seed_profiles),
+            "adzuna": adzuna_app(adzuna),
+        }
+        self.ports = {name: free_port() for name in self.apps}
+        self._servers = []
+        self._threads = []
+
+    def url(self, name) -> str:
+        return f"http://{self.host}:{self.ports[name]}"
+
+    def app_env(self) -> dict:
+        # Environment that points app.main at the fakes.
+        return {
+            "GROQ_API_KEY": "fake-groq-key",
+            "GROQ_BASE_URL": self.url("groq"),
+            "SUPABASE_URL": self.url("supabase"),
+            "SUPABASE_SERVICE_ROLE_KEY": "fake-service-role-key",
+            "SUPABASE_ANON_KEY": "fake-anon-key",
+            "ADZUNA_BASE_URL": f"{self.url('adzuna')}/v1/api/jobs",
+            "ADZUNA_APP_ID": "fake-app-id",
+            "ADZUNA_APP_KEY": "fake-app-key",
+        }
+
+    def start(self, timeout=10.0):
+        for name, app in self.apps.items():
+            config = uvicorn.Config(app, host=self.host, port=self.ports[name], log_level="warning", access_log=False)
+            server = uvicorn.Server(config)
+            thread = threading.Thread(target=server.run, name=f"fake-{name}", daemon=True)
+            thread.start()
+            self._servers.append(server)
+            self._threads.append(thread)
+        deadline = time.time() + timeout
+        while not all(s.started for s in self._servers):
+            if time.time() > deadline:
+                raise RuntimeError("Fake servers did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.should_exit = True
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+
+def fault_args(parser):
+    parser.add_argument("--groq", default="latency=600,jitter=200", help='e.g. "latency=800,jitter=300,errors=0.02,status=429,tps=400"')
+    parser.add_argument("--supabase", default="latency=25,jitter=10")
+    parser.add_argument("--adzuna", default="latency=250,jitter=100")
+    parser.add_argument("--seed-profiles", type=int, default=0, help="profile_resumes rows to pre-fill")
+
+
+def faults_from(args):
+    return (
+        Faults.parse(args.groq, error_status=429),
+        Faults.parse(args.supabase, error_status=503),
+        Faults.parse(args.adzuna, error_status=500),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Groq/Supabase/Adzuna fakes until interrupted.")
+    fault_args(parser)
+    args = parser.parse_args(argv)
+    groq, supabase, adzuna = faults_from(args)
+    fakes = FakeServers(groq, supabase, adzuna, args.seed_profiles).start()
+    for key, value in fakes.app_env().items():
+        print(f"export {key}={value}")
+    sys.stdout.flush()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    stop.wait()
+    fakes.stop()
+
+
+if __name__ == "__main__":
+    main()
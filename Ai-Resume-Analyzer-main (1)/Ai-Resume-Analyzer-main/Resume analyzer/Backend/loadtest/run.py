@@ -0,0 +1,136 @@
+"""End-to-end load test: fakes + the real app + the load driver, all local.
+
+Run from the Backend directory:
+
+    python -m loadtest.run --users 50 --ramp 20 --duration 60
+    python -m loadtest.run --groq "latency=1500,jitter=500,errors=0.05,status=429" --app-env LLM_MAX_CONCURRENCY=16
+    python -m loadtest.run --workers 4 --json report.json
+
+Starts the Groq/Supabase/Adzuna fakes (see loadtest.fakes), launches ``uvicorn app.main:app``
+in a subprocess pointed at them with fresh cache/index directories, drives it (see
+loadtest.driver) and prints per-endpoint throughput and tail latency, the event-loop
+probe, and how many requests/connections each fake received.
+"""
+import os
+import sys
+import time
+import signal
+import asyncio
+import tempfile
+import argparse
+import subprocess
+
+import httpx
+
+from .fakes import FakeServers, fault_args, faults_from, free_port
+from .driver import driver_args, driver_from, print_report, write_json
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LOADTEST_JWT_SECRET = "loadtest-jwt-secret-with-enough-bytes-for-hs256"
+
+
+def app_environment(fakes, workdir, extra):
+    env = dict(os.environ)
+    env.update(fakes.app_env())
+    env.update({
+        "SUPABASE_JWT_SECRET": LOADTEST_JWT_SECRET,
+        # cold, throwaway caches and indexes so runs are comparable and the real ones untouched
+        "CACHE_DIR": os.path.join(workdir, "cache"),
+        "INDEX_DIR": os.path.join(workdir, "index"),
+        "PYTHONUNBUFFERED": "1",
+    })
+    for item in extra:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def start_app(env, port, workers, log_path):
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--no-access-log"]
+    log = open(log_path, "w", encoding="utf-8")
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT), log
+
+
+def wait_ready(url, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup (code {process.returncode})")
+        try:
+            if httpx.get(f"{url}/openapi.json", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"App not ready after {timeout:g}s")
+
+
+def stop_app(process, timeout=15):
+    # SIGINT lets the lifespan close pools and stop the task workers.
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def fake_stats(fakes):
+    stats = {}
+    for name in fakes.apps:
+        try:
+            stats[name] = httpx.get(f"{fakes.url(name)}/_stats", timeout=5).json()
+        except httpx.HTTPError as e:
+            stats[name] = {"error": str(e)}
+    return stats
+
+
+def print_fake_stats(stats):
+    print(f"\n{'upstream':<10} {'requests':>9} {'injected':>9} {'peak conc':>10} {'connections':>12}")
+    for name, row in stats.items():
+        if "error" in row:
+            print(f"{name:<10} unavailable: {row['error']}")
+            continue
+        print(f"{name:<10} {row['requests']:>9} {row['injected_errors']:>9} {row['peak_in_flight']:>10} {row['connections']:>12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app against local fakes of its upstream services.")
+    fault_args(parser)
+    driver_args(parser)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the app")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="extra environment for the app (repeatable)")
+    parser.add_argument("--startup-timeout", type=float, default=90.0)
+    args = parser.parse_args(argv)
+
+    groq, supabase, adzuna = faults_from(args)
+    fakes = FakeServers(groq, supabase, adzuna, args.seed_profiles).start()
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(workdir, "app.log")
+    process, log = start_app(app_environment(fakes, workdir, args.app_env), port, args.workers, log_path)
+    print(f"fakes: groq={fakes.url('groq')} supabase={fakes.url('supabase')} adzuna={fakes.url('adzuna')}")
+    print(f"app: {url} (log: {log_path})")
+    try:
+        wait_ready(url, process, args.startup_timeout)
+        print(f"driving {args.users} users: ramp {args.ramp:g}s, hold {args.duration:g}s")
+        report = asyncio.run(driver_from(args, url, LOADTEST_JWT_SECRET).run())
+        report["upstreams"] = fake_stats(fakes)
+    finally:
+        stop_app(process)
+        log.close()
+        fakes.stop()
+
+    print_report(report)
+    print_fake_stats(report["upstreams"])
+    gateway = (report.get("app_stats") or {}).get("llm_gateway")
+    if gateway:
+        print(f"\napp llm_gateway: {gateway}")
+    write_json(args.json, report)
+
+
+if __name__ == "__main__":
+    main()
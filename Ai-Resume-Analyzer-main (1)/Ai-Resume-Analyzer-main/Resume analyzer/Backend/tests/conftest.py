@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# The app builds its clients, caches and stores at import time; keep them off the
+# developer's real cache/index directories.
+_tmp = tempfile.mkdtemp(prefix="resume-analyzer-tests-")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["CACHE_DIR"] = os.path.join(_tmp, "cache")
+os.environ["INDEX_DIR"] = os.path.join(_tmp, "index")
@@ -0,0 +1,26 @@
+import asyncio
+
+from app import adzuna_service
+from app.metrics import adzuna_mock_fallbacks
+
+
+def _mock_fallbacks(reason):
+    return adzuna_mock_fallbacks._values.get((reason,), 0)
+
+
+def test_no_role_or_skills_returns_mock_jobs(monkeypatch):
+    monkeypatch.setattr(adzuna_service, "ADZUNA_APP_ID", "test-app")
+    before = _mock_fallbacks("no_keywords")
+
+    jobs = asyncio.run(adzuna_service.fetch_jobs("", [], "India", "Python developer resume"))
+
+    assert jobs and all(job["source"] == "Adzuna (Mock)" for job in jobs)
+    assert _mock_fallbacks("no_keywords") == before + 1
+
+
+def test_find_jobs_with_empty_keywords_does_not_fail(monkeypatch):
+    monkeypatch.setattr(adzuna_service, "ADZUNA_APP_ID", "test-app")
+
+    jobs, source = asyncio.run(adzuna_service.find_jobs("", [], "India", "Python developer resume"))
+
+    assert jobs and source == "adzuna"
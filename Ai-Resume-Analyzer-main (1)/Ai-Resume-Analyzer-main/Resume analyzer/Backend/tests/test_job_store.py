@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app import adzuna_service
+from app.job_store import JobStore
+
+
+def _posting(i, title):
+    return {
+        "id": f"job-{i}",
+        "title": title,
+        "company": {"display_name": f"Company {i}"},
+        "location": {"display_name": "Bengaluru, Karnataka"},
+        "description": "Work on backend services with Python, SQL and Spring Boot.",
+        "redirect_url": f"https://example.com/jobs/{i}",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    store.ingest([_posting(i, "Java Developer") for i in range(12)], country="in")
+    return store
+
+
+def test_search_requires_the_role_in_the_title(store):
+    assert len(store.search("Java Developer", ["Spring"], "in")) == 12
+    assert len(store.search("Senior Java Developer", [], "in")) == 12
+    assert store.search("Senior Data Scientist", ["Python", "SQL"], "in") == []
+    assert store.search("Python Developer", ["Python"], "in") == []
+
+
+def test_unrelated_role_falls_through_to_adzuna(store, monkeypatch):
+    calls = []
+
+    async def fetch_jobs(role, skills, location="India", resume_text=""):
+        calls.append(role)
+        return [{"job_title": "Data Scientist", "source": "Adzuna"}]
+
+    monkeypatch.setattr(adzuna_service, "job_store", store)
+    monkeypatch.setattr(adzuna_service, "fetch_jobs", fetch_jobs)
+
+    jobs, source = asyncio.run(adzuna_service.find_jobs("Senior Data Scientist", ["Python", "SQL"], "India"))
+
+    assert source == "adzuna"
+    assert calls == ["Senior Data Scientist"]
+
+    jobs, source = asyncio.run(adzuna_service.find_jobs("Java Developer", ["Spring"], "India"))
+    assert source == "local" and len(jobs) == 12
+    assert calls == ["Senior Data Scientist"]
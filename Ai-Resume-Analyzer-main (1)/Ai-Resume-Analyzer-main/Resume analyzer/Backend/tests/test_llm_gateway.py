@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from groq import RateLimitError
+
+from app.llm_gateway import LLMGateway, LLM_BACKOFF_MAX
+
+
+def _chunk(text):
+    return SimpleNamespace(x_groq=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_a_slow_stream_reader_does_not_hold_the_concurrency_slot():
+    async def create(stream=False, **kwargs):
+        if not stream:
+            return SimpleNamespace(usage=None)
+
+        async def chunks():
+            for text in ("a", "b"):
+                yield _chunk(text)
+        return chunks()
+
+    gateway = LLMGateway(_client(create), max_concurrency=1)
+
+    async def run():
+        deltas = gateway.stream_chat_completion(model="m", messages=[])
+        first = await deltas.__anext__()
+        # the stream is paused mid-way, as with a slow SSE client
+        await asyncio.wait_for(gateway.chat_completion(model="m", messages=[]), timeout=1)
+        rest = [delta async for delta in deltas]
+        return [first] + rest
+
+    assert asyncio.run(run()) == ["a", "b"]
+
+
+def test_retry_after_is_capped_at_the_backoff_maximum():
+    response = httpx.Response(
+        429, headers={"retry-after": "600"}, request=httpx.Request("POST", "https://api.groq.com")
+    )
+    error = RateLimitError("rate limited", response=response, body=None)
+    gateway = LLMGateway(_client(None))
+
+    assert gateway._backoff(error, 0) == LLM_BACKOFF_MAX
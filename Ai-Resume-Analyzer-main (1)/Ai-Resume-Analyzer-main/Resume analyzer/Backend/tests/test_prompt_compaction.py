@@ -0,0 +1,45 @@
+from app.prompt_compaction import compact_resume, summarize_contact_lines
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+Experience
+Software Engineer, Acme Corp 2019 - 2023
+Built billing services in Python and FastAPI.
+Backend Developer, Initech 2016-2019
+Education
+B.Tech CSE, IIT 2012 - 2016
+"""
+
+
+def test_dated_experience_and_education_lines_are_kept():
+    compacted = compact_resume(RESUME)
+    assert "Software Engineer, Acme Corp 2019 - 2023" in compacted
+    assert "Backend Developer, Initech 2016-2019" in compacted
+    assert "B.Tech CSE, IIT 2012 - 2016" in compacted
+
+
+def test_contact_only_lines_are_summarized():
+    compacted = compact_resume(RESUME)
+    assert "jane.doe@example.com" not in compacted
+    assert "555" not in compacted
+    assert "[contact details present: email, phone, links]" in compacted
+
+
+def test_mixed_lines_keep_their_non_contact_text():
+    lines = summarize_contact_lines(["Jane Doe | jane@example.com", "Phone: +91-98765 43210", "Jan 2018 - Mar 2020 2020 - 2022"])
+    assert lines == ["Jane Doe", "[contact details present: email, phone]", "Jan 2018 - Mar 2020 2020 - 2022"]
+
+
+def test_dates_next_to_titles_are_not_phone_numbers():
+    lines = [
+        "Software Engineer, Acme 01.2019 - 03.2023",
+        "Backend Dev 2019.01 - 2023.03",
+        "Data Analyst (06 2018 - 09 2020)",
+        "B.Tech, CGPA 8.9/10 2016 - 2020",
+    ]
+    assert summarize_contact_lines(lines) == lines
+
+
+def test_phone_numbers_are_still_recognised():
+    lines = summarize_contact_lines(["Jane Doe", "+44 20 7946 0958", "Mobile: 98765 43210", "(555) 123-4567"])
+    assert lines == ["Jane Doe", "[contact details present: phone]"]
@@ -0,0 +1,15 @@
+from app.skill_engine import SkillMatcher, default_matcher
+
+
+def test_non_ascii_case_folds_do_not_crash_or_match():
+    matcher = default_matcher()
+    assert matcher.extract("gıt") == []
+    assert matcher.extract("reſt api") == []
+    assert matcher.extract("Versioned with Git, deployed via Docker — résumé café naïve") == ["Docker", "git"]
+
+
+def test_occurrence_matrix_skips_unicode_folds():
+    matcher = SkillMatcher.from_list(["Git", "REST API"])
+    matrix, names = matcher.occurrence_matrix(["gıt and reſt api", "git and rest api"])
+    assert names == ["Git", "REST API"]
+    assert matrix.toarray().tolist() == [[0, 0], [1, 1]]
@@ -0,0 +1,61 @@
+import json
+import asyncio
+
+from app import ats
+from app.llm_cache import llm_result_cache
+from app.streaming import IncrementalJSONObjectParser
+
+RESUME = "Jane Doe. Python developer with five years of FastAPI, Docker and PostgreSQL experience."
+JD = "We are hiring a Python backend developer with FastAPI, Docker and AWS experience."
+
+
+def _feed(parser, text, size=7):
+    events = []
+    for i in range(0, len(text), size):
+        events += parser.feed(text[i:i + size])
+    return events
+
+
+def test_raw_newlines_in_strings_are_kept():
+    parser = IncrementalJSONObjectParser()
+    _feed(parser, '{"ats_score": 80, "strengths": ["Led team\nof 5"], "final_verdict": "Strong Match"}')
+
+    assert parser.finished
+    assert parser.result == {"ats_score": 80, "strengths": ["Led team\nof 5"], "final_verdict": "Strong Match"}
+
+
+def test_streamed_field_with_raw_newline_does_not_fail():
+    parser = IncrementalJSONObjectParser(stream_fields=("resume_text",))
+    events = _feed(parser, '{"resume_text": "Jane Doe\nPython developer", "ok": true}')
+
+    deltas = "".join(value for kind, key, value in events if kind == "delta")
+    assert deltas == "Jane Doe\nPython developer"
+    assert parser.result == {"resume_text": "Jane Doe\nPython developer", "ok": True}
+
+
+def _stream_analysis(monkeypatch, resume, reply):
+    async def stream_chat_completion(**request):
+        for i in range(0, len(reply), 16):
+            yield reply[i:i + 16]
+
+    monkeypatch.setattr(ats.llm_gateway, "stream_chat_completion", stream_chat_completion)
+
+    async def run():
+        return [event async for event in ats.stream_resume_analysis(resume, JD)]
+    return asyncio.run(run())
+
+
+def test_incomplete_streamed_analysis_is_not_cached(monkeypatch):
+    resume = RESUME + " Incomplete."
+    events = _stream_analysis(monkeypatch, resume, '{"ats_score": 80, "final_verdict": "Strong Match"}')
+
+    assert events[-1] == ("done", {"ats_score": 80, "final_verdict": "Strong Match"})
+    assert llm_result_cache.get(ats.ats_cache_key(resume, JD)) is None
+
+
+def test_complete_streamed_analysis_is_cached(monkeypatch):
+    result = {k: [] for k in ats.ATS_RESULT_FIELDS}
+    result.update(ats_score=80, section_scores={}, skills_match_percentage=70, final_verdict="Strong Match")
+    _stream_analysis(monkeypatch, RESUME, json.dumps(result))
+
+    assert llm_result_cache.get(ats.ats_cache_key(RESUME, JD)) == result
@@ -0,0 +1,95 @@
+import time
+import asyncio
+import sqlite3
+
+from app.task_queue import TaskQueue
+
+
+def _queue(path, calls, lease=900):
+    queue = TaskQueue(str(path), workers=2, lease=lease)
+
+    async def handler(payload, content):
+        calls.append(payload["n"])
+        await asyncio.sleep(0.05)
+        return {"n": payload["n"]}
+
+    queue.register("echo", handler)
+    return queue
+
+
+def _insert(path, task_id, status, started_at=None):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO tasks (id, kind, owner, dedupe_key, status, payload, created_at, started_at)"
+            " VALUES (?, 'echo', 'o', ?, ?, ?, ?, ?)",
+            (task_id, task_id, status, f'{{"n": "{task_id}"}}', time.time(), started_at),
+        )
+
+
+def test_processes_sharing_the_table_run_each_task_once(tmp_path):
+    path = tmp_path / "tasks.sqlite3"
+    calls = []
+    first, second = _queue(path, calls), _queue(path, calls)
+    _insert(path, "queued-task", "queued")
+    _insert(path, "live-task", "running", started_at=time.time())
+    _insert(path, "orphaned-task", "running", started_at=time.time() - 3600)
+
+    async def run():
+        first.start()
+        second.start()
+        await asyncio.sleep(0.3)
+        statuses = {t: (await first.get(t))["status"] for t in ("queued-task", "live-task", "orphaned-task")}
+        await first.stop()
+        await second.stop()
+        return statuses
+
+    statuses = asyncio.run(run())
+
+    assert sorted(calls) == ["orphaned-task", "queued-task"]
+    assert statuses == {"queued-task": "succeeded", "live-task": "running", "orphaned-task": "succeeded"}
+
+
+def test_worker_survives_a_failing_iteration(tmp_path):
+    calls = []
+    queue = _queue(tmp_path / "tasks.sqlite3", calls)
+    finish = queue._finish
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_finish(*args):
+        if failures:
+            raise failures.pop()
+        return finish(*args)
+
+    queue._finish = flaky_finish
+
+    async def run():
+        queue.start()
+        first, _ = await queue.submit("echo", "o", {"n": 1})
+        second, _ = await queue.submit("echo", "o", {"n": 2})
+        await asyncio.sleep(0.3)
+        result = [(await queue.get(t["task_id"]))["status"] for t in (first, second)]
+        await queue.stop()
+        return result
+
+    assert sorted(asyncio.run(run())) == ["failed", "succeeded"]
+
+
+def test_finished_tasks_can_be_left_out_of_dedupe(tmp_path):
+    calls = []
+    queue = _queue(tmp_path / "tasks.sqlite3", calls)
+
+    async def run():
+        queue.start()
+        first, _ = await queue.submit("echo", "o", {"n": 1})
+        await asyncio.sleep(0.2)
+        again, deduplicated = await queue.submit("echo", "o", {"n": 1})
+        rerun, rerun_deduplicated = await queue.submit("echo", "o", {"n": 1}, dedupe_finished=False)
+        await asyncio.sleep(0.2)
+        await queue.stop()
+        return first, again, deduplicated, rerun, rerun_deduplicated
+
+    first, again, deduplicated, rerun, rerun_deduplicated = asyncio.run(run())
+
+    assert deduplicated and again["task_id"] == first["task_id"]
+    assert not rerun_deduplicated and rerun["task_id"] != first["task_id"]
+    assert calls == [1, 1]